@@ -1,5 +1,6 @@
 from .theme import Theme
 from .utils import load_theme, list_themes, make_graph
+from .ipython import load_ipython_extension, unload_ipython_extension
 
 __all__ = [
     "Theme",
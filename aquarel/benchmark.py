@@ -0,0 +1,200 @@
+import io
+import time
+import tracemalloc
+from typing import Iterable, Optional, Tuple, Union
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from .theme import Theme
+from .utils import list_themes, load_theme
+
+# Export formats to benchmark, by the backend that renders them
+_backend_formats = {"agg": "png", "pdf": "pdf", "svg": "svg"}
+
+
+def _line_workload(ax, rng: np.random.Generator, size: int):
+    """
+    Plots two noisy random walks.
+
+    :param ax: the axes to plot on
+    :param rng: the random number generator
+    :param size: number of points per line
+    """
+    for _ in range(2):
+        ax.plot(np.cumsum(rng.normal(size=size)), label="walk")
+    ax.legend()
+
+
+def _scatter_workload(ax, rng: np.random.Generator, size: int):
+    """
+    Plots two overlapping point clouds.
+
+    :param ax: the axes to plot on
+    :param rng: the random number generator
+    :param size: number of points per cloud
+    """
+    for shift in [0, 2]:
+        ax.scatter(*rng.normal(loc=shift, size=(2, size)), label="cloud")
+    ax.legend()
+
+
+def _kde_workload(ax, rng: np.random.Generator, size: int):
+    """
+    Plots filled contours of a two-dimensional kernel density estimate, like `sns.kdeplot(..., fill=True)`.
+
+    :param ax: the axes to plot on
+    :param rng: the random number generator
+    :param size: number of samples
+    """
+    samples = rng.normal(size=(2, size))
+    counts, x_edges, y_edges = np.histogram2d(*samples, bins=100)
+    # Gaussian smoothing of the binned samples, applied separably along both dimensions
+    offsets = np.arange(-10, 11)
+    kernel = np.exp(-0.5 * (offsets / 3) ** 2)
+    kernel /= kernel.sum()
+    density = np.apply_along_axis(np.convolve, 0, counts, kernel, mode="same")
+    density = np.apply_along_axis(np.convolve, 1, density, kernel, mode="same")
+    x = (x_edges[:-1] + x_edges[1:]) / 2
+    y = (y_edges[:-1] + y_edges[1:]) / 2
+    ax.contourf(x, y, density.T, levels=10)
+
+
+def _boxplot_workload(ax, rng: np.random.Generator, size: int):
+    """
+    Plots boxplots of two groups.
+
+    :param ax: the axes to plot on
+    :param rng: the random number generator
+    :param size: number of samples per group
+    """
+    ax.boxplot([rng.normal(size=size), rng.normal(loc=1, size=size)], patch_artist=True)
+
+
+_workloads = {
+    "line": _line_workload,
+    "scatter": _scatter_workload,
+    "kde": _kde_workload,
+    "boxplot": _boxplot_workload,
+}
+
+
+def _render(theme: Theme, workload: str, size: int, format: str) -> Tuple[int, int]:
+    """
+    Plots a workload under a theme and exports it.
+
+    :param theme: the theme to render with
+    :param workload: name of the workload
+    :param size: data size of the workload
+    :param format: the export format
+    :return: size of the exported file in bytes, and size of the pixel buffer of the renderer in bytes for raster
+        formats, which is allocated outside the Python heap
+    """
+    rng = np.random.default_rng(0)
+    with theme:
+        figure, ax = plt.subplots(figsize=(6, 4))
+        _workloads[workload](ax, rng, size)
+    buffer = io.BytesIO()
+    dpi = theme.export_kwargs(format).get("dpi", "figure")
+    dpi = figure.dpi if dpi == "figure" else dpi
+    width, height = figure.get_size_inches() * dpi
+    theme.savefig(figure, buffer, format=format)
+    plt.close(figure)
+    raster_memory = int(round(width)) * int(round(height)) * 4 if format == "png" else 0
+    return buffer.getbuffer().nbytes, raster_memory
+
+
+def benchmark_themes(
+    themes: Optional[Iterable[Union[Theme, str]]] = None,
+    workloads: Optional[Iterable[str]] = None,
+    sizes: Iterable[int] = (1_000, 10_000, 100_000),
+    backends: Iterable[str] = ("agg", "pdf", "svg"),
+    repeat: int = 1,
+    time_budget: Optional[float] = None,
+    memory_budget: Optional[int] = None,
+) -> dict:
+    """
+    Measures the rendering cost of themes. Every workload is plotted under every theme at every data size and
+    exported with every backend. Times are the best of the repetitions; peak memory is traced in a separate run,
+    so tracing does not distort the times. Peak memory is the peak of Python allocations, including numpy arrays,
+    traced with `tracemalloc`, plus the RGBA pixel buffer of the Agg renderer, which `tracemalloc` does not see.
+    Other memory allocated by the backends outside the Python heap is not included.
+
+    :param themes: themes or theme names to benchmark, default: all bundled themes
+    :param workloads: workloads to plot. Possible values are {"line", "scatter", "kde", "boxplot"}, default: all
+    :param sizes: data sizes to plot each workload at
+    :param backends: backends to export with. Possible values are {"agg", "pdf", "svg"}
+    :param repeat: number of timed repetitions per run
+    :param time_budget: total render time in seconds above which a theme is flagged, default: no budget
+    :param memory_budget: peak memory in bytes above which a theme is flagged, default: no budget
+    :return: dict of reports by theme name, with the total time, maximum peak memory, total output size, whether the
+        theme exceeds the budgets, and the individual runs
+    :raise ValueError: if a workload or backend is not available
+    """
+    themes = list_themes() if themes is None else themes
+    workloads = list(_workloads.keys()) if workloads is None else list(workloads)
+    backends = list(backends)
+    for workload in workloads:
+        if workload not in _workloads.keys():
+            raise ValueError(f"Workload '{workload}' not available. Available options are {list(_workloads.keys())}")
+    for backend in backends:
+        if backend not in _backend_formats.keys():
+            raise ValueError(
+                f"Backend '{backend}' not available. Available options are {list(_backend_formats.keys())}"
+            )
+    reports = {}
+    for theme in themes:
+        if isinstance(theme, str):
+            theme = load_theme(theme)
+        runs = []
+        for workload in workloads:
+            for size in sizes:
+                for backend in backends:
+                    format = _backend_formats[backend]
+                    durations = []
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        output_size, _ = _render(theme, workload, size, format)
+                        durations.append(time.perf_counter() - start)
+                    tracemalloc.start()
+                    _, raster_memory = _render(theme, workload, size, format)
+                    _, peak_memory = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    peak_memory += raster_memory
+                    runs.append(
+                        {
+                            "workload": workload,
+                            "size": size,
+                            "backend": backend,
+                            "time": min(durations),
+                            "peak_memory": peak_memory,
+                            "output_size": output_size,
+                        }
+                    )
+        total_time = sum(run["time"] for run in runs)
+        peak_memory = max((run["peak_memory"] for run in runs), default=0)
+        reports[theme.info.get("name", "Untitled")] = {
+            "time": total_time,
+            "peak_memory": peak_memory,
+            "output_size": sum(run["output_size"] for run in runs),
+            "over_budget": (time_budget is not None and total_time > time_budget)
+            or (memory_budget is not None and peak_memory > memory_budget),
+            "runs": runs,
+        }
+    return reports
+
+
+def format_report(reports: dict) -> str:
+    """
+    Formats benchmark reports as a table, cheapest theme first.
+
+    :param reports: reports as returned by `benchmark_themes`
+    :return: the table
+    """
+    lines = [f"{'theme':<20} {'time [s]':>10} {'peak [MiB]':>11} {'output [KiB]':>13}  budget"]
+    for name, report in sorted(reports.items(), key=lambda item: item[1]["time"]):
+        lines.append(
+            f"{name:<20} {report['time']:>10.3f} {report['peak_memory'] / 2 ** 20:>11.1f} "
+            f"{report['output_size'] / 2 ** 10:>13.1f}  {'exceeded' if report['over_budget'] else 'ok'}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,282 @@
+import hashlib
+import io
+import os
+import pickle
+import types
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+
+from .render import _resolve_figure
+from .theme import Theme
+
+# Salt for SVG element ids, fixed so identical figures produce identical files
+_SVG_HASHSALT = "aquarel"
+
+
+def _update_fingerprint(digest, obj):
+    """
+    Feeds a stable representation of plot function arguments into a hash.
+
+    :param digest: the hashlib object to update
+    :param obj: the object to fingerprint
+    """
+    if isinstance(obj, np.ndarray):
+        digest.update(f"ndarray:{obj.dtype.str}:{obj.shape}".encode())
+        if obj.dtype.hasobject:
+            digest.update(pickle.dumps(obj.tolist(), protocol=4))
+        else:
+            digest.update(np.ascontiguousarray(obj).data)
+    elif isinstance(obj, (list, tuple)):
+        digest.update(f"{type(obj).__name__}:{len(obj)}".encode())
+        for item in obj:
+            _update_fingerprint(digest, item)
+    elif isinstance(obj, dict):
+        digest.update(f"dict:{len(obj)}".encode())
+        for key in sorted(obj.keys(), key=repr):
+            _update_fingerprint(digest, key)
+            _update_fingerprint(digest, obj[key])
+    elif isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        digest.update(f"{type(obj).__name__}:{obj!r}".encode())
+    elif isinstance(obj, types.FunctionType):
+        digest.update(_function_identity(obj).encode())
+    else:
+        digest.update(pickle.dumps(obj, protocol=4))
+
+
+def _update_code_fingerprint(digest, code: types.CodeType):
+    """
+    Feeds the bytecode, names and constants of a code object into a hash. Nested code objects, e.g. of lambdas,
+    comprehensions and nested functions, are hashed recursively, as their representation contains memory addresses
+    that differ between processes.
+
+    :param digest: the hashlib object to update
+    :param code: the code object to fingerprint
+    """
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    digest.update(f"consts:{len(code.co_consts)}".encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _update_code_fingerprint(digest, const)
+        elif isinstance(const, frozenset):
+            # Set order depends on string hash randomization
+            digest.update(f"frozenset:{sorted(repr(item) for item in const)}".encode())
+        else:
+            digest.update(repr(const).encode())
+
+
+def _function_identity(plot_fn: Callable, _seen: Optional[set] = None) -> str:
+    """
+    Identifies a plot function by its qualified name and, if available, a hash of its bytecode, constants, default
+    arguments and the values captured by its closure, so closures over different values are told apart. Global
+    variables read by the function are not part of the identity.
+
+    :param plot_fn: the plot function
+    :param _seen: functions already being identified, to stop at recursive closures
+    :return: identity string
+    """
+    identity = f"{getattr(plot_fn, '__module__', '')}.{getattr(plot_fn, '__qualname__', repr(plot_fn))}"
+    code = getattr(plot_fn, "__code__", None)
+    if code is not None:
+        _seen = (_seen or set()) | {id(plot_fn)}
+        digest = hashlib.sha256()
+        _update_code_fingerprint(digest, code)
+        _update_fingerprint(digest, plot_fn.__defaults__)
+        _update_fingerprint(digest, plot_fn.__kwdefaults__)
+        for cell in plot_fn.__closure__ or ():
+            try:
+                value = cell.cell_contents
+            except ValueError:
+                # Cells of variables not yet assigned are empty
+                digest.update(b"empty cell")
+                continue
+            if isinstance(value, types.FunctionType):
+                # Functions captured by the closure, including the function itself if it is recursive
+                digest.update(
+                    b"recursive" if id(value) in _seen else _function_identity(value, _seen).encode()
+                )
+            else:
+                _update_fingerprint(digest, value)
+        identity += f":{digest.hexdigest()}"
+    return identity
+
+
+class RenderCache:
+    """
+    Content-addressed cache of rendered figures. Entries are keyed by the theme content hash, the plot function
+    identity, a fingerprint of the plot function arguments and the export settings, so repeated renders are served
+    without drawing. Entries live in an in-memory LRU tier and optionally in an on-disk tier.
+    """
+
+    def __init__(
+        self,
+        max_items: int = 128,
+        max_bytes: Optional[int] = None,
+        directory: Optional[Union[str, os.PathLike]] = None,
+        max_disk_bytes: Optional[int] = None,
+    ):
+        """
+        :param max_items: maximum number of entries held in memory
+        :param max_bytes: maximum total size of entries held in memory, default: unlimited
+        :param directory: directory of the on-disk tier, default: no on-disk tier
+        :param max_disk_bytes: maximum total size of the on-disk tier, least recently used files are removed first,
+            default: unlimited
+        """
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory is not None else None
+        self.max_disk_bytes = max_disk_bytes
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+        self._entries = OrderedDict()
+        self._size = 0
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, theme: Theme, plot_fn: Callable, args: tuple = (), kwargs: Optional[dict] = None,
+            format: Optional[str] = None, savefig_kwargs: Optional[dict] = None) -> str:
+        """
+        Computes the cache key of a render.
+
+        :param theme: the theme to render with
+        :param plot_fn: the plot function
+        :param args: positional arguments of the plot function
+        :param kwargs: keyword arguments of the plot function
+        :param format: the export format
+        :param savefig_kwargs: additional keyword arguments for savefig
+        :return: hex digest
+        """
+        digest = hashlib.sha256()
+        digest.update(theme.content_hash().encode())
+        digest.update(_function_identity(plot_fn).encode())
+        _update_fingerprint(digest, args)
+        _update_fingerprint(digest, kwargs or {})
+        _update_fingerprint(digest, theme.export_kwargs(format))
+        _update_fingerprint(digest, savefig_kwargs or {})
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Looks up an entry, first in memory, then on disk.
+
+        :param key: the cache key
+        :return: the cached bytes, or None if not cached
+        """
+        if key in self._entries.keys():
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return self._entries[key]
+        if self.directory is not None:
+            path = self.directory / key
+            if path.exists():
+                data = path.read_bytes()
+                # Touch the file so disk eviction removes least recently used entries first
+                os.utime(path)
+                self._store(key, data)
+                self.stats["disk_hits"] += 1
+                return data
+        return None
+
+    def put(self, key: str, data: bytes):
+        """
+        Adds an entry to all tiers.
+
+        :param key: the cache key
+        :param data: the rendered bytes
+        """
+        self._store(key, data)
+        if self.directory is not None:
+            (self.directory / key).write_bytes(data)
+            self._evict_disk()
+
+    def clear(self):
+        """
+        Removes all entries from all tiers.
+        """
+        self._entries.clear()
+        self._size = 0
+        if self.directory is not None:
+            for path in self.directory.iterdir():
+                if path.is_file():
+                    path.unlink()
+
+    def render(
+        self,
+        theme: Theme,
+        plot_fn: Callable,
+        *args,
+        format: Optional[str] = None,
+        savefig_kwargs: Optional[dict] = None,
+        **kwargs,
+    ) -> bytes:
+        """
+        Renders a plot function under a theme and returns the exported file contents, served from the cache if an
+        identical render was cached before. Output is deterministic: SVG ids use a fixed salt and file metadata like
+        creation dates is omitted.
+
+        :param theme: the theme to render with
+        :param plot_fn: function that plots the figure, returning a figure, a tuple starting with a figure, or None
+            to use the current figure
+        :param args: positional arguments of the plot function
+        :param format: the export format, default: the themes' export format
+        :param savefig_kwargs: additional keyword arguments for savefig
+        :param kwargs: keyword arguments of the plot function
+        :return: the exported file contents
+        """
+        key = self.key(theme, plot_fn, args, kwargs, format, savefig_kwargs)
+        data = self.get(key)
+        if data is not None:
+            return data
+        self.stats["misses"] += 1
+        with theme:
+            figure = _resolve_figure(plot_fn(*args, **kwargs))
+        format = theme.export_kwargs(format)["format"]
+        export = {
+            "metadata": {name: None for name in theme._export_metadata_keys.get(format, [])},
+            **(savefig_kwargs or {}),
+        }
+        buffer = io.BytesIO()
+        with mpl.rc_context({"svg.hashsalt": _SVG_HASHSALT}):
+            theme.savefig(figure, buffer, format=format, **export)
+        plt.close(figure)
+        data = buffer.getvalue()
+        self.put(key, data)
+        return data
+
+    def _store(self, key: str, data: bytes):
+        """
+        Adds an entry to the in-memory tier and evicts least recently used entries beyond the limits.
+
+        :param key: the cache key
+        :param data: the rendered bytes
+        """
+        if key in self._entries.keys():
+            self._size -= len(self._entries.pop(key))
+        self._entries[key] = data
+        self._size += len(data)
+        while len(self._entries) > self.max_items or (
+            self.max_bytes is not None and self._size > self.max_bytes and len(self._entries) > 1
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def _evict_disk(self):
+        """
+        Removes least recently used files from the on-disk tier beyond its size limit.
+        """
+        if self.max_disk_bytes is None:
+            return
+        files = sorted(
+            (path for path in self.directory.iterdir() if path.is_file()),
+            key=lambda path: path.stat().st_mtime,
+        )
+        total = sum(path.stat().st_size for path in files)
+        for path in files[:-1]:
+            if total <= self.max_disk_bytes:
+                break
+            total -= path.stat().st_size
+            path.unlink()
@@ -0,0 +1,109 @@
+import os
+from typing import Optional, Union
+
+import matplotlib as mpl
+
+from .theme import Theme, _open_figures
+from .utils import load_theme
+
+# The theme active in the kernel, and the content hash it was last applied with
+_active = {"theme": None, "hash": None}
+
+
+def activate(theme: Optional[Union[Theme, str]]):
+    """
+    Activates a theme for all following cells: its rcparams are applied once, and its transforms are applied to the
+    figures of every cell. Activating the already active theme again does not re-apply it.
+
+    :param theme: theme, theme name, or path to a theme file, or None to deactivate the active theme
+    """
+    if isinstance(theme, str):
+        theme = Theme.from_file(theme) if os.path.isfile(theme) else load_theme(theme)
+    if theme is None:
+        if _active["theme"] is not None:
+            mpl.rcParams.update(mpl.rcParamsDefault)
+        _active["theme"], _active["hash"] = None, None
+        return
+    _active["theme"] = theme
+    _refresh()
+
+
+def active_theme() -> Optional[Theme]:
+    """
+    :return: the theme active in the kernel, or None
+    """
+    return _active["theme"]
+
+
+def _refresh():
+    """
+    Applies the active theme if it changed since it was last applied.
+    """
+    theme = _active["theme"]
+    if theme is None:
+        return
+    content_hash = theme.content_hash()
+    if content_hash != _active["hash"]:
+        theme.apply()
+        _active["hash"] = content_hash
+
+
+def _pre_run_cell(*args):
+    """
+    Re-applies the active theme before a cell if it was modified.
+    """
+    _refresh()
+
+
+def _post_execute():
+    """
+    Applies the transforms of the active theme to all open figures after a cell. Axes that were transformed
+    before and did not change are skipped, so only figures produced or modified by the cell are processed.
+    """
+    theme = _active["theme"]
+    if theme is not None:
+        # Without plt.figure(), which would make each figure the current one
+        figures = _open_figures()
+        if len(figures) > 0:
+            theme.apply_transforms(figures)
+
+
+def _aquarel_magic(line: str):
+    """
+    Activates a theme for all following cells by name or theme file path, e.g. `%aquarel arctic_dark`, deactivates
+    it with `%aquarel off`, or shows the active theme without arguments.
+    """
+    line = line.strip()
+    if line == "":
+        theme = _active["theme"]
+        print(f"Active theme: {theme.info.get('name', 'Untitled')}" if theme is not None else "No active theme")
+    elif line == "off":
+        activate(None)
+    else:
+        activate(line)
+
+
+def load_ipython_extension(ipython):
+    """
+    Loads the extension with `%load_ext aquarel`, registering the `%aquarel` magic and the hooks that keep the
+    active theme applied.
+
+    :param ipython: the IPython shell
+    """
+    ipython.register_magic_function(_aquarel_magic, magic_kind="line", magic_name="aquarel")
+    ipython.events.register("pre_run_cell", _pre_run_cell)
+    # Transforms have to run before the inline backend shows and closes the figures of the cell
+    callbacks = ipython.events.callbacks["post_execute"]
+    if _post_execute not in callbacks:
+        callbacks.insert(0, _post_execute)
+
+
+def unload_ipython_extension(ipython):
+    """
+    Unloads the extension with `%unload_ext aquarel`, deactivating the active theme.
+
+    :param ipython: the IPython shell
+    """
+    activate(None)
+    ipython.events.unregister("pre_run_cell", _pre_run_cell)
+    ipython.events.unregister("post_execute", _post_execute)
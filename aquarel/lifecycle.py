@@ -0,0 +1,121 @@
+import weakref
+from typing import Optional
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+
+
+def _figure_memory(figure) -> int:
+    """
+    Estimates the memory held by a figure from its data arrays and, if it was drawn, the pixel buffer of its canvas.
+
+    :param figure: the figure
+    :return: estimated size in bytes
+    """
+    size = 0
+    renderer = getattr(figure.canvas, "renderer", None)
+    if renderer is not None:
+        size += int(renderer.width) * int(renderer.height) * 4
+    for artist in figure.findobj():
+        if isinstance(artist, mpl.lines.Line2D):
+            size += artist.get_xydata().nbytes
+        elif isinstance(artist, mpl.collections.Collection):
+            size += artist.get_offsets().nbytes
+            size += sum(path.vertices.nbytes for path in artist.get_paths())
+        elif isinstance(artist, mpl.image.AxesImage) and artist.get_array() is not None:
+            size += artist.get_array().nbytes
+    return size
+
+
+class FigureLifecycle:
+    """
+    Tracks figures created within theme contexts and closes them according to a policy and a budget, so long-running
+    themed pipelines do not accumulate open figures.
+    """
+
+    # Options for when tracked figures are closed
+    _policy_options = ["export", "exit", "budget"]
+
+    def __init__(self, policy: str = "export", max_figures: Optional[int] = None, max_memory: Optional[int] = None):
+        """
+        :param policy: when to close tracked figures. "export" closes them after `Theme.savefig`, "exit" when
+            leaving the theme context, after transforms are applied, and "budget" only when the budget is exceeded.
+            With every policy, the oldest tracked figures are closed once the budget is exceeded.
+        :param max_figures: maximum number of open tracked figures, default: unlimited
+        :param max_memory: maximum estimated memory of open tracked figures in bytes, default: unlimited
+        :raise ValueError: if the policy is not available
+        """
+        if policy not in self._policy_options:
+            raise ValueError(f"Policy '{policy}' not available. Available options are {self._policy_options}")
+        self.policy = policy
+        self.max_figures = max_figures
+        self.max_memory = max_memory
+        self.stats = {"tracked": 0, "closed": 0, "peak_figures": 0, "peak_memory": 0}
+        self._figures = []
+
+    def _open(self) -> list:
+        """
+        Returns the tracked figures that are still open, oldest first.
+
+        :return: list of figures
+        """
+        figures = [ref() for ref in self._figures]
+        figures = [
+            figure for figure in figures
+            if figure is not None and getattr(figure, "number", None) is not None and plt.fignum_exists(figure.number)
+        ]
+        self._figures = [weakref.ref(figure) for figure in figures]
+        return figures
+
+    def track(self, figures: list):
+        """
+        Starts tracking figures and enforces the budget.
+
+        :param figures: the figures to track
+        """
+        open_figures = self._open()
+        for figure in figures:
+            if figure not in open_figures:
+                self._figures.append(weakref.ref(figure))
+                self.stats["tracked"] += 1
+        self.enforce()
+
+    def close(self, figure):
+        """
+        Closes a figure and stops tracking it.
+
+        :param figure: the figure to close
+        """
+        if any(ref() is figure for ref in self._figures):
+            self._figures = [ref for ref in self._figures if ref() is not figure]
+            self.stats["closed"] += 1
+        plt.close(figure)
+
+    def enforce(self):
+        """
+        Closes the oldest tracked figures until the budget is met, and updates the peak usage.
+        """
+        figures = self._open()
+        memory = [_figure_memory(figure) for figure in figures]
+        self.stats["peak_figures"] = max(self.stats["peak_figures"], len(figures))
+        self.stats["peak_memory"] = max(self.stats["peak_memory"], sum(memory))
+        while len(figures) > 0 and (
+            (self.max_figures is not None and len(figures) > self.max_figures)
+            or (self.max_memory is not None and sum(memory) > self.max_memory)
+        ):
+            self.close(figures.pop(0))
+            memory.pop(0)
+
+    def report(self) -> dict:
+        """
+        Reports the current and peak usage of tracked figures.
+
+        :return: dict with the number and estimated memory of open tracked figures, their peaks, and the number of
+            tracked and closed figures
+        """
+        figures = self._open()
+        return {
+            "figures": len(figures),
+            "memory": sum(_figure_memory(figure) for figure in figures),
+            **self.stats,
+        }
@@ -0,0 +1,433 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Union
+
+import matplotlib as mpl
+import numpy as np
+from matplotlib.colors import LinearSegmentedColormap, ListedColormap, to_rgba_array
+
+if TYPE_CHECKING:
+    from .theme import Theme
+
+# D65 reference white in XYZ
+_WHITE_POINT = np.array([0.95047, 1.0, 1.08883])
+# Linear sRGB to XYZ (D65)
+_RGB_TO_XYZ = np.array(
+    [
+        [0.4124564, 0.3575761, 0.1804375],
+        [0.2126729, 0.7151522, 0.0721750],
+        [0.0193339, 0.1191920, 0.9503041],
+    ]
+)
+# Color vision deficiency simulation matrices in linear RGB (Machado et al., 2009, severity 1.0)
+_CVD_MATRICES = {
+    "protanopia": np.array(
+        [
+            [0.152286, 1.052583, -0.204868],
+            [0.114503, 0.786281, 0.099216],
+            [-0.003882, -0.048116, 1.051998],
+        ]
+    ),
+    "deuteranopia": np.array(
+        [
+            [0.367322, 0.860646, -0.227968],
+            [0.280085, 0.672501, 0.047413],
+            [-0.011820, 0.042940, 0.968881],
+        ]
+    ),
+    "tritanopia": np.array(
+        [
+            [1.255528, -0.076749, -0.178779],
+            [-0.078411, 0.930809, 0.147602],
+            [0.004733, 0.691367, 0.303900],
+        ]
+    ),
+}
+
+
+def to_linear_rgb(colors: np.ndarray) -> np.ndarray:
+    """
+    Converts sRGB values in [0, 1] to linear RGB.
+
+    :param colors: array of shape (..., 3) of sRGB values
+    :return: array of the same shape with linear RGB values
+    """
+    colors = np.asarray(colors, dtype=float)
+    return np.where(
+        colors <= 0.04045, colors / 12.92, ((colors + 0.055) / 1.055) ** 2.4
+    )
+
+
+def to_srgb(colors: np.ndarray) -> np.ndarray:
+    """
+    Converts linear RGB values to sRGB values in [0, 1].
+
+    :param colors: array of shape (..., 3) of linear RGB values
+    :return: array of the same shape with sRGB values
+    """
+    colors = np.clip(np.asarray(colors, dtype=float), 0, 1)
+    return np.where(
+        colors <= 0.0031308, colors * 12.92, 1.055 * colors ** (1 / 2.4) - 0.055
+    )
+
+
+def linear_rgb_to_lab(colors: np.ndarray) -> np.ndarray:
+    """
+    Converts linear RGB values to CIE Lab (D65).
+
+    :param colors: array of shape (..., 3) of linear RGB values
+    :return: array of the same shape with L*, a*, b* values
+    """
+    xyz = (np.asarray(colors, dtype=float) @ _RGB_TO_XYZ.T) / _WHITE_POINT
+    delta = 6 / 29
+    f = np.where(xyz > delta ** 3, np.cbrt(xyz), xyz / (3 * delta ** 2) + 4 / 29)
+    return np.stack(
+        [
+            116 * f[..., 1] - 16,
+            500 * (f[..., 0] - f[..., 1]),
+            200 * (f[..., 1] - f[..., 2]),
+        ],
+        axis=-1,
+    )
+
+
+def lab_to_linear_rgb(colors: np.ndarray) -> np.ndarray:
+    """
+    Converts CIE Lab (D65) values to linear RGB. Out-of-gamut colors are clipped.
+
+    :param colors: array of shape (..., 3) of L*, a*, b* values
+    :return: array of the same shape with linear RGB values
+    """
+    colors = np.asarray(colors, dtype=float)
+    f_y = (colors[..., 0] + 16) / 116
+    f = np.stack([f_y + colors[..., 1] / 500, f_y, f_y - colors[..., 2] / 200], axis=-1)
+    delta = 6 / 29
+    xyz = np.where(f > delta, f ** 3, 3 * delta ** 2 * (f - 4 / 29)) * _WHITE_POINT
+    return np.clip(xyz @ np.linalg.inv(_RGB_TO_XYZ).T, 0, 1)
+
+
+def relative_luminance(colors: np.ndarray) -> np.ndarray:
+    """
+    Computes the WCAG relative luminance of linear RGB values.
+
+    :param colors: array of shape (..., 3) of linear RGB values
+    :return: array of shape (...) with luminance values
+    """
+    return np.asarray(colors, dtype=float) @ np.array([0.2126, 0.7152, 0.0722])
+
+
+def contrast_ratio(foreground: np.ndarray, background: np.ndarray) -> np.ndarray:
+    """
+    Computes the WCAG contrast ratio between broadcastable arrays of linear RGB values.
+
+    :param foreground: array of shape (..., 3) of linear RGB values
+    :param background: array of shape (..., 3) of linear RGB values
+    :return: array of contrast ratios in [1, 21]
+    """
+    lum_fg = relative_luminance(foreground)
+    lum_bg = relative_luminance(background)
+    return (np.maximum(lum_fg, lum_bg) + 0.05) / (np.minimum(lum_fg, lum_bg) + 0.05)
+
+
+def delta_e(lab_1: np.ndarray, lab_2: np.ndarray) -> np.ndarray:
+    """
+    Computes the CIEDE2000 color difference between broadcastable arrays of Lab values.
+
+    :param lab_1: array of shape (..., 3) of Lab values
+    :param lab_2: array of shape (..., 3) of Lab values
+    :return: array of color differences
+    """
+    l_1, a_1, b_1 = np.moveaxis(np.asarray(lab_1, dtype=float), -1, 0)
+    l_2, a_2, b_2 = np.moveaxis(np.asarray(lab_2, dtype=float), -1, 0)
+    c_mean = (np.hypot(a_1, b_1) + np.hypot(a_2, b_2)) / 2
+    g = 0.5 * (1 - np.sqrt(c_mean ** 7 / (c_mean ** 7 + 25 ** 7)))
+    a_1, a_2 = a_1 * (1 + g), a_2 * (1 + g)
+    c_1, c_2 = np.hypot(a_1, b_1), np.hypot(a_2, b_2)
+    h_1 = np.degrees(np.arctan2(b_1, a_1)) % 360
+    h_2 = np.degrees(np.arctan2(b_2, a_2)) % 360
+    # Hue difference, wrapped to [-180, 180]
+    dh = h_2 - h_1
+    dh = np.where(dh > 180, dh - 360, np.where(dh < -180, dh + 360, dh))
+    dh = np.where(c_1 * c_2 == 0, 0, dh)
+    d_l = l_2 - l_1
+    d_c = c_2 - c_1
+    d_h = 2 * np.sqrt(c_1 * c_2) * np.sin(np.radians(dh / 2))
+    # Mean lightness, chroma and hue
+    l_mean = (l_1 + l_2) / 2
+    c_mean = (c_1 + c_2) / 2
+    h_mean = h_1 + h_2
+    h_mean = np.where(
+        c_1 * c_2 == 0,
+        h_mean,
+        np.where(
+            np.abs(h_1 - h_2) <= 180,
+            h_mean / 2,
+            np.where(h_mean < 360, (h_mean + 360) / 2, (h_mean - 360) / 2),
+        ),
+    )
+    t = (
+        1
+        - 0.17 * np.cos(np.radians(h_mean - 30))
+        + 0.24 * np.cos(np.radians(2 * h_mean))
+        + 0.32 * np.cos(np.radians(3 * h_mean + 6))
+        - 0.20 * np.cos(np.radians(4 * h_mean - 63))
+    )
+    s_l = 1 + 0.015 * (l_mean - 50) ** 2 / np.sqrt(20 + (l_mean - 50) ** 2)
+    s_c = 1 + 0.045 * c_mean
+    s_h = 1 + 0.015 * c_mean * t
+    r_t = (
+        -2
+        * np.sqrt(c_mean ** 7 / (c_mean ** 7 + 25 ** 7))
+        * np.sin(np.radians(60 * np.exp(-(((h_mean - 275) / 25) ** 2))))
+    )
+    return np.sqrt(
+        (d_l / s_l) ** 2
+        + (d_c / s_c) ** 2
+        + (d_h / s_h) ** 2
+        + r_t * (d_c / s_c) * (d_h / s_h)
+    )
+
+
+def simulate_cvd(colors: np.ndarray, deficiency: str) -> np.ndarray:
+    """
+    Simulates how linear RGB colors are perceived with a color vision deficiency.
+
+    :param colors: array of shape (..., 3) of linear RGB values
+    :param deficiency: the deficiency to simulate, can be {"protanopia", "deuteranopia", "tritanopia"}
+    :return: array of the same shape with simulated linear RGB values
+    :raise ValueError: if the deficiency is unknown
+    """
+    if deficiency not in _CVD_MATRICES.keys():
+        raise ValueError(
+            f"Unknown deficiency '{deficiency}'. Available options are: {list(_CVD_MATRICES.keys())}"
+        )
+    return np.clip(np.asarray(colors, dtype=float) @ _CVD_MATRICES[deficiency].T, 0, 1)
+
+
+def _theme_palette(theme: "Theme") -> List:
+    """
+    Returns the color palette of a theme, falling back to the matplotlib default cycle.
+
+    :param theme: the theme to extract the palette from
+    :return: list of color specifications
+    """
+    palette = theme.params.get("colors", {}).get("palette")
+    if not palette:
+        palette = mpl.rcParamsDefault["axes.prop_cycle"].by_key()["color"]
+    return list(palette)
+
+
+def _theme_background(theme: "Theme") -> str:
+    """
+    Returns the plot background color of a theme. Transparent backgrounds resolve to the matplotlib default.
+
+    :param theme: the theme to extract the background color from
+    :return: a color specification
+    """
+    colors = theme.params.get("colors", {})
+    for key in ["plot_background_color", "figure_background_color"]:
+        color = colors.get(key)
+        if color is not None and mpl.colors.to_rgba(color)[3] > 0:
+            return color
+    return mpl.rcParamsDefault["axes.facecolor"]
+
+
+def _stack_palettes(palettes: Sequence[Sequence]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converts a list of palettes of varying length to one padded sRGB array.
+
+    :param palettes: list of palettes, each a list of color specifications
+    :return: (colors, mask) tuple, with colors of shape (P, K, 3) and a boolean mask of shape (P, K)
+    """
+    size = max([len(palette) for palette in palettes] + [1])
+    colors = np.zeros((len(palettes), size, 3))
+    mask = np.zeros((len(palettes), size), dtype=bool)
+    for i, palette in enumerate(palettes):
+        if len(palette) > 0:
+            colors[i, : len(palette)] = to_rgba_array(palette)[:, :3]
+            mask[i, : len(palette)] = True
+    return colors, mask
+
+
+def _min_pairwise(distances: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Computes the minimum off-diagonal distance per palette, ignoring padded entries.
+
+    :param distances: array of shape (P, K, K) of pairwise distances
+    :param mask: boolean array of shape (P, K) marking valid colors
+    :return: array of shape (P,), NaN for palettes with less than two colors
+    """
+    size = mask.shape[1]
+    valid = mask[:, :, None] & mask[:, None, :] & ~np.eye(size, dtype=bool)
+    minimum = np.where(valid, distances, np.inf).min(axis=(1, 2))
+    return np.where(np.isinf(minimum), np.nan, minimum)
+
+
+def analyze_palettes(
+    palettes: Optional[Dict[str, Sequence]] = None,
+    backgrounds: Optional[Dict[str, str]] = None,
+    themes: Optional[Union[Dict[str, "Theme"], List["Theme"]]] = None,
+) -> Dict[str, dict]:
+    """
+    Analyzes color palettes in batch. Computes contrast ratios against the background, pairwise CIEDE2000
+    differences and the pairwise differences under simulated color vision deficiencies.
+    If neither palettes nor themes are given, all bundled themes are analyzed.
+
+    :param palettes: dict of palette name and list of color specifications
+    :param backgrounds: dict of palette name and background color, default: the matplotlib default background
+    :param themes: dict of name and Theme, or list of Themes (keyed by their name) to analyze in addition to palettes
+    :return: a {name: report} dict. Each report holds the palette "size", per-color "contrast" ratios and their
+        minimum as "min_contrast", the pairwise "delta_e" matrix and its minimum as "min_delta_e", and
+        "min_delta_e_<deficiency>" for each simulated color vision deficiency
+    """
+    palettes = dict(palettes) if palettes is not None else {}
+    backgrounds = dict(backgrounds) if backgrounds is not None else {}
+    if palettes == {} and themes is None:
+        from .utils import list_themes, load_theme
+
+        themes = {name: load_theme(name) for name in list_themes()}
+    if themes is not None:
+        if not isinstance(themes, dict):
+            themes = {theme.info.get("name", "Untitled"): theme for theme in themes}
+        for name, theme in themes.items():
+            palettes[name] = _theme_palette(theme)
+            backgrounds[name] = _theme_background(theme)
+    names = list(palettes.keys())
+    if len(names) == 0:
+        return {}
+
+    colors, mask = _stack_palettes([palettes[name] for name in names])
+    background = to_rgba_array(
+        [backgrounds.get(name, mpl.rcParamsDefault["axes.facecolor"]) for name in names]
+    )[:, :3]
+    linear = to_linear_rgb(colors)
+    # Contrast of each color against its palettes' background, shape (P, K)
+    contrast = contrast_ratio(linear, to_linear_rgb(background)[:, None, :])
+    contrast = np.where(mask, contrast, np.nan)
+    # Pairwise color differences, shape (P, K, K)
+    lab = linear_rgb_to_lab(linear)
+    distances = delta_e(lab[:, :, None, :], lab[:, None, :, :])
+    min_distances = {"min_delta_e": _min_pairwise(distances, mask)}
+    for deficiency in _CVD_MATRICES.keys():
+        lab_cvd = linear_rgb_to_lab(simulate_cvd(linear, deficiency))
+        min_distances[f"min_delta_e_{deficiency}"] = _min_pairwise(
+            delta_e(lab_cvd[:, :, None, :], lab_cvd[:, None, :, :]), mask
+        )
+
+    report = {}
+    for i, name in enumerate(names):
+        size = int(mask[i].sum())
+        report[name] = {
+            "size": size,
+            "contrast": contrast[i, :size],
+            "min_contrast": float(np.nanmin(contrast[i])) if size > 0 else np.nan,
+            "delta_e": distances[i, :size, :size],
+            **{key: float(value[i]) for key, value in min_distances.items()},
+        }
+    return report
+
+
+# Colormaps registered with matplotlib by palette_colormap, by name
+_registered_colormaps = {}
+
+
+@lru_cache(maxsize=256)
+def _expand_palette(palette: Tuple, n: int) -> Tuple[str, ...]:
+    """
+    Cached implementation of expand_palette on hashable palettes.
+
+    :param palette: tuple of color specifications
+    :param n: number of colors to return
+    :return: tuple of n hex colors
+    """
+    ring = linear_rgb_to_lab(to_linear_rgb(to_rgba_array(list(palette))[:, :3]))
+    colors = [ring]
+    count = len(ring)
+    while count < n and len(ring) > 1:
+        # Insert the perceptual midpoint between each pair of neighbouring colors
+        midpoints = (ring[:-1] + ring[1:]) / 2
+        colors.append(midpoints)
+        count += len(midpoints)
+        ring = np.insert(ring, np.arange(1, len(ring)), midpoints, axis=0)
+    if count < n:
+        # Single-color palettes cannot be interpolated, so they repeat
+        colors = [np.resize(np.concatenate(colors), (n, 3))]
+    rgb = to_srgb(lab_to_linear_rgb(np.concatenate(colors)[:n]))
+    return tuple(mpl.colors.to_hex(color) for color in rgb)
+
+
+def expand_palette(palette: Sequence, n: int) -> List[str]:
+    """
+    Expands a palette to n colors. The original colors come first, followed by perceptual (Lab) midpoints between
+    neighbouring colors, inserted level by level to keep successive colors distinguishable.
+    If n is smaller than the palette, the palette is truncated.
+
+    :param palette: list of color specifications
+    :param n: number of colors to return
+    :return: list of n hex colors
+    """
+    if len(palette) == 0 or n <= 0:
+        return []
+    return list(_expand_palette(tuple(palette), n))
+
+
+@lru_cache(maxsize=64)
+def _build_colormap(name: str, palette: Tuple, kind: str, n: int):
+    """
+    Builds the lookup table of a palette colormap once per palette, kind and size.
+
+    :param name: name of the colormap
+    :param palette: tuple of color specifications
+    :param kind: type of colormap, can be {"linear", "listed"}
+    :param n: number of colormap entries
+    :return: the colormap
+    """
+    if kind == "listed":
+        return ListedColormap(expand_palette(palette, n), name=name)
+    # Interpolate in Lab along the palette order, then hand the sampled colors to matplotlib
+    lab = linear_rgb_to_lab(to_linear_rgb(to_rgba_array(list(palette))[:, :3]))
+    if len(lab) == 1:
+        lab = np.concatenate([lab, lab])
+    positions = np.linspace(0, 1, len(lab))
+    samples = np.linspace(0, 1, n)
+    lut = np.stack(
+        [np.interp(samples, positions, lab[:, i]) for i in range(3)], axis=-1
+    )
+    return LinearSegmentedColormap.from_list(
+        name, list(to_srgb(lab_to_linear_rgb(lut))), N=n
+    )
+
+
+def palette_colormap(
+    palette: Sequence,
+    name: str,
+    kind: str = "linear",
+    n: Optional[int] = None,
+    register: bool = True,
+):
+    """
+    Returns a colormap derived from a palette. Lookup tables are built once and cached; the colormap is registered
+    with matplotlib under its name on first use, so it can be referenced by name, e.g. in `imshow(cmap=name)`.
+
+    :param palette: list of color specifications
+    :param name: name of the colormap
+    :param kind: type of colormap, "linear" for a continuous colormap interpolated in Lab space, "listed" for a
+        discrete colormap of palette colors, can be {"linear", "listed"}, default: "linear"
+    :param n: number of colormap entries, default: 256 for "linear", palette length for "listed"
+    :param register: whether to register the colormap with matplotlib, default: True
+    :return: the colormap
+    :raise ValueError: if the kind is unknown or the palette is empty
+    """
+    if kind not in ["linear", "listed"]:
+        raise ValueError(f"Unknown colormap kind '{kind}'. Available options are: {['linear', 'listed']}")
+    if len(palette) == 0:
+        raise ValueError("Cannot derive a colormap from an empty palette.")
+    if n is None:
+        n = 256 if kind == "linear" else len(palette)
+    cmap = _build_colormap(name, tuple(palette), kind, n)
+    if register and _registered_colormaps.get(name) is not cmap:
+        if hasattr(mpl, "colormaps"):
+            mpl.colormaps.register(cmap, name=name, force=True)
+        else:
+            mpl.cm.register_cmap(name=name, cmap=cmap)
+        _registered_colormaps[name] = cmap
+    return cmap
@@ -0,0 +1,168 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Callable, Iterable, Iterator, Optional, Union
+
+import numpy as np
+
+from .render import render_to_array
+from .theme import Theme
+
+# Shared memory ring, free slot queue and slot size of a worker process
+_worker = {}
+
+
+def _init_worker(name: str, slot_bytes: int, free):
+    """
+    Attaches a worker process to the shared memory ring.
+
+    :param name: name of the shared memory block
+    :param slot_bytes: size of a slot in bytes
+    :param free: queue of free slot indices
+    """
+    _worker["memory"] = shared_memory.SharedMemory(name=name)
+    _worker["slot_bytes"] = slot_bytes
+    _worker["free"] = free
+
+
+def _render_task(task: tuple) -> tuple:
+    """
+    Renders a plot function in a worker and writes the pixels into a free slot of the ring, waiting for one if the
+    ring is full.
+
+    :param task: index, theme dictionary, plot function, positional and keyword arguments, and dpi
+    :return: index, slot and shape of the pixels
+    """
+    index, data, plot_fn, args, kwargs, dpi = task
+    theme = Theme.from_dict(data, headless=True)
+    pixels = render_to_array(theme, plot_fn, *args, dpi=dpi, **kwargs)
+    if pixels.nbytes > _worker["slot_bytes"]:
+        raise ValueError(f"Rendered image of {pixels.nbytes} bytes exceeds the slot size of {_worker['slot_bytes']}")
+    slot = _worker["free"].get()
+    view = np.ndarray(pixels.shape, dtype=np.uint8, buffer=_worker["memory"].buf, offset=slot * _worker["slot_bytes"])
+    view[...] = pixels
+    return index, slot, pixels.shape
+
+
+class RenderResult:
+    """
+    Pixels of a render in a slot of the shared memory ring. The slot is returned to the ring when the result is
+    released, after which the pixels must no longer be used. Can be used as a context manager that releases the
+    result on exit.
+    """
+
+    def __init__(self, pool: "RenderPool", index: int, slot: int, shape: tuple):
+        """
+        :param pool: the pool the result belongs to
+        :param index: position of the render in the submitted items
+        :param slot: the slot holding the pixels
+        :param shape: shape of the pixels
+        """
+        self.index = index
+        self.slot = slot
+        self._pool = pool
+        self.pixels = np.ndarray(shape, dtype=np.uint8, buffer=pool._memory.buf, offset=slot * pool.slot_bytes)
+        pool._held.add(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def release(self):
+        """
+        Returns the slot to the ring, so workers can render into it again.
+        """
+        if self.pixels is not None:
+            self.pixels = None
+            self._pool._held.discard(self)
+            self._pool._free.put(self.slot)
+
+
+class RenderPool:
+    """
+    Process pool that renders themed figures in workers and transports the pixels through a ring of shared memory
+    slots instead of pickling them. Workers wait for a free slot when all slots hold unreleased results, so memory
+    stays bounded and throughput is limited by drawing rather than by copies between processes.
+    Can be used as a context manager that shuts the pool down on exit, terminating the workers if the results were
+    not all consumed and released.
+    """
+
+    def __init__(self, processes: Optional[int] = None, slots: Optional[int] = None, slot_bytes: int = 2 ** 24):
+        """
+        :param processes: number of worker processes, default: the number of CPUs
+        :param slots: number of slots in the ring, should be at least the number of processes for full
+            throughput, default: twice the number of processes
+        :param slot_bytes: size of a slot in bytes, must fit the largest rendered image of 4 bytes per pixel,
+            default: 16 MiB
+        """
+        processes = processes if processes is not None else mp.cpu_count()
+        self.slots = slots if slots is not None else 2 * processes
+        self.slot_bytes = slot_bytes
+        self._memory = shared_memory.SharedMemory(create=True, size=self.slots * slot_bytes)
+        context = mp.get_context()
+        self._free = context.Queue()
+        # Results not yet released, and whether a render was left before all its results were consumed
+        self._held = set()
+        self._incomplete = False
+        for slot in range(self.slots):
+            self._free.put(slot)
+        self._pool = context.Pool(
+            processes, initializer=_init_worker, initargs=(self._memory.name, slot_bytes, self._free)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close(terminate=exc_type is not None)
+
+    def render(
+        self,
+        theme: Theme,
+        plot_fn: Callable,
+        items: Iterable[Union[tuple, dict]],
+        dpi: Optional[Union[float, int]] = None,
+    ) -> Iterator[RenderResult]:
+        """
+        Renders a plot function for each item in the workers, yielding results in order of completion. Each
+        result has to be released once its pixels are processed, to return its slot to the ring.
+
+        :param theme: the theme to render with
+        :param plot_fn: function that plots the figure, defined at module level so it can be sent to the workers
+        :param items: arguments of the plot function per render, a tuple of positional or a dict of keyword arguments
+        :param dpi: resolution to draw at, default: the themes' export dpi, or the figure dpi
+        :return: iterator of results, their `index` is the position of the item
+        """
+        data = {"info": theme.info, "params": theme.params, "overrides": theme.overrides, "transforms": theme.transforms}
+        tasks = (
+            (index, data, plot_fn, item if isinstance(item, tuple) else (), item if isinstance(item, dict) else {}, dpi)
+            for index, item in enumerate(items)
+        )
+        complete = False
+        try:
+            for index, slot, shape in self._pool.imap_unordered(_render_task, tasks):
+                yield RenderResult(self, index, slot, shape)
+            complete = True
+        finally:
+            # Workers of an abandoned render may wait for slots that are never released
+            self._incomplete = self._incomplete or not complete
+
+    def close(self, terminate: bool = False):
+        """
+        Shuts the workers down and frees the shared memory. Waits for the workers to finish, unless results are
+        still held or a render was left early, as workers may then wait for a free slot forever; in that case, or if
+        requested, the workers are terminated and the pixels of held results become unavailable.
+
+        :param terminate: whether to terminate the workers without waiting for them
+        """
+        if terminate or self._incomplete or len(self._held) > 0:
+            self._pool.terminate()
+        else:
+            self._pool.close()
+        self._pool.join()
+        for result in list(self._held):
+            result.pixels = None
+        self._held.clear()
+        self._memory.close()
+        self._memory.unlink()
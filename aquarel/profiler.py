@@ -0,0 +1,199 @@
+import functools
+import time
+
+import matplotlib as mpl
+import matplotlib.axes
+import matplotlib.axis
+import matplotlib.collections
+import matplotlib.figure
+import matplotlib.image
+import matplotlib.legend
+import matplotlib.lines
+import matplotlib.patches
+import matplotlib.spines
+import matplotlib.text
+
+# Original draw methods by class while a profiler is active
+_originals = {}
+# The active profiler, draws are attributed to it
+_active = None
+
+
+def _artist_classes() -> list:
+    """
+    Returns all loaded artist classes that define their own draw method.
+
+    :return: list of classes
+    """
+    classes, pending = [], [mpl.artist.Artist]
+    while len(pending) > 0:
+        cls = pending.pop()
+        if "draw" in vars(cls):
+            classes.append(cls)
+        pending.extend(cls.__subclasses__())
+    return list(dict.fromkeys(classes))
+
+
+def _category(artist, stack: list) -> str:
+    """
+    Returns the theme parameter category, as in `Theme._rcparams_mapping`, that styles an artist.
+
+    :param artist: the artist being drawn
+    :param stack: entries of the artists currently being drawn, outermost first
+    :return: the category, or "other" for artists not styled by a category
+    """
+    for entry in reversed(stack):
+        parent = entry[0]
+        if isinstance(parent, mpl.legend.Legend):
+            return "legend"
+        if isinstance(parent, mpl.axis.Tick):
+            if artist is parent.gridline:
+                return "grid"
+            if artist is parent.label1 or artist is parent.label2:
+                return "tick_labels"
+            return "ticks"
+    parent = stack[-1][0] if len(stack) > 0 else None
+    if isinstance(artist, mpl.legend.Legend):
+        return "legend"
+    if isinstance(artist, (mpl.axis.Axis, mpl.axis.Tick)):
+        return "ticks"
+    if isinstance(artist, mpl.text.Text):
+        if isinstance(parent, mpl.axis.Axis):
+            return "axis_labels" if artist is parent.label else "tick_labels"
+        if isinstance(parent, mpl.axes.Axes) and artist in [parent.title, parent._left_title, parent._right_title]:
+            return "title"
+        if isinstance(parent, mpl.figure.FigureBase) and artist is getattr(parent, "_suptitle", None):
+            return "title"
+        return "fonts"
+    if isinstance(artist, (mpl.spines.Spine, mpl.axes.Axes)):
+        return "axes"
+    if isinstance(artist, mpl.lines.Line2D):
+        return "lines"
+    if isinstance(artist, (mpl.collections.Collection, mpl.patches.Patch, mpl.image.AxesImage)):
+        return "colors"
+    return "other"
+
+
+def _profiled(draw):
+    """
+    Wraps a draw method to record its exclusive wall time with the active profiler.
+
+    :param draw: the original draw method
+    :return: the wrapped draw method
+    """
+
+    @functools.wraps(draw)
+    def wrapper(artist, *args, **kwargs):
+        profiler = _active
+        # Calls to a draw method of a parent class are part of the same draw
+        if profiler is None or (len(profiler._stack) > 0 and profiler._stack[-1][0] is artist):
+            return draw(artist, *args, **kwargs)
+        category = _category(artist, profiler._stack)
+        entry = [artist, 0.0]
+        profiler._stack.append(entry)
+        start = time.perf_counter()
+        try:
+            return draw(artist, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            profiler._stack.pop()
+            if len(profiler._stack) > 0:
+                profiler._stack[-1][1] += elapsed
+            else:
+                profiler._total += elapsed
+            profiler._record(type(artist).__name__, category, elapsed - entry[1])
+
+    return wrapper
+
+
+class DrawProfiler:
+    """
+    Attributes the draw time of figures to artist types and to the theme parameter categories that styled them.
+    While active, the draw methods of all artist classes are wrapped; otherwise they are left untouched, so the
+    profiler has no overhead when it is not in use. Can be used as a (reentrant) context manager.
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._stack = []
+        self._total = 0.0
+        self.types = {}
+        self.categories = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        """
+        Starts profiling draws.
+
+        :raise RuntimeError: if another profiler is active
+        """
+        global _active
+        if _active is not None and _active is not self:
+            raise RuntimeError("Another draw profiler is already active")
+        if self._depth == 0:
+            _active = self
+            for cls in _artist_classes():
+                _originals[cls] = vars(cls)["draw"]
+                cls.draw = _profiled(_originals[cls])
+        self._depth += 1
+
+    def stop(self):
+        """
+        Stops profiling draws and restores the original draw methods.
+        """
+        global _active
+        if self._depth == 0:
+            return
+        self._depth -= 1
+        if self._depth == 0:
+            for cls, draw in _originals.items():
+                cls.draw = draw
+            _originals.clear()
+            _active = None
+
+    def reset(self):
+        """
+        Discards all recorded draws.
+        """
+        self._total = 0.0
+        self.types = {}
+        self.categories = {}
+
+    def _record(self, artist_type: str, category: str, elapsed: float):
+        for stats, key in [(self.types, artist_type), (self.categories, category)]:
+            entry = stats.setdefault(key, {"time": 0.0, "calls": 0})
+            entry["time"] += elapsed
+            entry["calls"] += 1
+
+    def report(self) -> dict:
+        """
+        Reports the recorded draw time, ranked by exclusive time, i.e. excluding the time of drawing children.
+
+        :return: dict with the total draw time, and the time and calls by artist type and by category
+        """
+
+        def ranked(stats):
+            return dict(sorted(((key, dict(value)) for key, value in stats.items()), key=lambda x: -x[1]["time"]))
+
+        return {"total": self._total, "types": ranked(self.types), "categories": ranked(self.categories)}
+
+    def format_report(self) -> str:
+        """
+        Formats the report as ranked tables of categories and artist types.
+
+        :return: the tables
+        """
+        report = self.report()
+        lines = [f"total draw time: {report['total'] * 1000:.1f} ms"]
+        for name, section in [("category", "categories"), ("type", "types")]:
+            lines.append(f"\n{name:<20} {'time [ms]':>10} {'share':>7} {'calls':>8}")
+            for key, value in report[section].items():
+                share = value["time"] / report["total"] if report["total"] > 0 else 0
+                lines.append(f"{key:<20} {value['time'] * 1000:>10.1f} {share:>7.1%} {value['calls']:>8}")
+        return "\n".join(lines)
@@ -0,0 +1,284 @@
+import itertools
+import sys
+from typing import Callable, Iterable, List, Optional
+
+import numpy as np
+
+# Entry point group third-party packages register their transforms under
+ENTRY_POINT_GROUP = "aquarel.transforms"
+# Parts of a plot transforms may touch, in the order they are processed
+_touches_options = ["artists", "ticks", "spines", "legend"]
+
+# Registered transforms by name, with their function and metadata
+_registry = {}
+# Entry points of not yet loaded third-party transforms by name, discovered on first lookup of an unknown name
+_entry_points = None
+
+
+class AxesPass:
+    """
+    Shared state of one pass of fused transforms over an axes. Tick locations are queried once and shared between
+    transforms, while tick, tick parameter and spine updates are collected and applied once when the pass ends. Can
+    be used as a context manager that ends the pass on exit.
+    """
+
+    def __init__(self, ax):
+        """
+        :param ax: the axes to transform
+        """
+        self.ax = ax
+        self._ticks = {}
+        self._pending_ticks = {}
+        self._tick_params = {"x": {}, "y": {}}
+        self._spines = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.flush()
+
+    def axis(self, name: str):
+        """
+        :param name: {"x", "y"}
+        :return: the x- or y-axis
+        """
+        return self.ax.xaxis if name == "x" else self.ax.yaxis
+
+    def ticks(self, name: str, minor: bool = False) -> np.ndarray:
+        """
+        Returns the tick locations of an axis, including pending updates.
+
+        :param name: {"x", "y"}
+        :param minor: whether to return the minor ticks
+        :return: the tick locations
+        """
+        if (name, minor) not in self._ticks.keys():
+            axis = self.axis(name)
+            self._ticks[(name, minor)] = np.asarray(axis.get_minorticklocs() if minor else axis.get_majorticklocs())
+        return self._ticks[(name, minor)]
+
+    def set_ticks(self, name: str, locs, minor: bool = False):
+        """
+        Sets fixed tick locations of an axis once the pass ends.
+
+        :param name: {"x", "y"}
+        :param locs: the tick locations
+        :param minor: whether to set the minor ticks
+        """
+        self._ticks[(name, minor)] = self._pending_ticks[(name, minor)] = np.asarray(locs)
+
+    def invalidate(self, name: str):
+        """
+        Discards the shared tick locations of an axis, e.g. after its locators were changed.
+
+        :param name: {"x", "y"}
+        """
+        for minor in [False, True]:
+            if (name, minor) not in self._pending_ticks.keys():
+                self._ticks.pop((name, minor), None)
+
+    def tick_params(self, name: str, **kwargs):
+        """
+        Sets tick parameters of an axis once the pass ends, see `Axes.tick_params`.
+
+        :param name: {"x", "y"}
+        :param kwargs: the tick parameters
+        """
+        self._tick_params[name].update(kwargs)
+
+    def label_rotation(self, name: str) -> float:
+        """
+        Returns the rotation of the tick labels of an axis, including pending updates.
+
+        :param name: {"x", "y"}
+        :return: rotation in degrees
+        """
+        if "rotation" in self._tick_params[name].keys():
+            return self._tick_params[name]["rotation"]
+        return self.axis(name).majorTicks[0].label1.get_rotation()
+
+    def spine(self, side: str, position: Optional[tuple] = None, bounds: Optional[tuple] = None):
+        """
+        Sets the position or bounds of a spine once the pass ends.
+
+        :param side: {"top", "right", "left", "bottom"}
+        :param position: the spine position, see `Spine.set_position`
+        :param bounds: the spine bounds, see `Spine.set_bounds`
+        """
+        update = self._spines.setdefault(side, {})
+        if position is not None:
+            update["position"] = position
+        if bounds is not None:
+            update["bounds"] = bounds
+
+    def flush(self):
+        """
+        Applies all pending updates to the axes.
+        """
+        for (name, minor), locs in self._pending_ticks.items():
+            self.axis(name).set_ticks(locs, minor=minor)
+        for name, params in self._tick_params.items():
+            if len(params) > 0:
+                self.ax.tick_params(axis=name, **params)
+        # Spines are updated last, as moving a spine resets the ticks of its axis, which are then recreated lazily
+        # with the tick parameters set above
+        for side, update in self._spines.items():
+            spine = self.ax.spines[side]
+            if "position" in update.keys():
+                spine.set_position(update["position"])
+            if "bounds" in update.keys():
+                spine.set_bounds(*update["bounds"])
+        self._pending_ticks = {}
+        self._tick_params = {"x": {}, "y": {}}
+        self._spines = {}
+
+
+def register_transform(
+    name: Optional[str] = None,
+    function: Optional[Callable] = None,
+    touches: Iterable[str] = ("artists",),
+    per_axes: Optional[Callable] = None,
+):
+    """
+    Registers a transform, so themes can reference it by name. Can be used as a decorator. The function is called
+    with the transform arguments of the theme and an `axes` keyword argument holding the list of axes to transform.
+
+    :param name: name of the transform, default: the function name
+    :param function: the transform function, default: return a decorator that registers the decorated function
+    :param touches: parts of the plot the transform modifies. Possible values are {"artists", "ticks", "spines",
+        "legend"}. Transforms are applied stage by stage in this order, according to the last part they touch, and in
+        registration order within a stage.
+    :param per_axes: implementation of the transform for a single axes, called with an `AxesPass` and the transform
+        arguments. Consecutive transforms with per-axes implementations are fused into one pass per axes.
+    :return: the function, or a decorator if no function is given
+    :raise ValueError: if a touched part is not available
+    """
+    touches = list(touches)
+    for part in touches:
+        if part not in _touches_options:
+            raise ValueError(f"Part '{part}' not available. Available options are {_touches_options}")
+
+    def decorator(fn: Callable) -> Callable:
+        _registry[name if name is not None else fn.__name__] = {
+            "function": fn,
+            "touches": touches,
+            "stage": max((_touches_options.index(part) for part in touches), default=0),
+            "per_axes": per_axes,
+            "index": len(_registry),
+        }
+        return fn
+
+    return decorator if function is None else decorator(function)
+
+
+def _discover_entry_points() -> dict:
+    """
+    Reads the names of third-party transforms from the installed package metadata, without importing them.
+
+    :return: dict of entry points by transform name
+    """
+    global _entry_points
+    if _entry_points is None:
+        if sys.version_info >= (3, 8):
+            from importlib.metadata import entry_points
+        else:
+            try:
+                from importlib_metadata import entry_points
+            except ImportError:
+                _entry_points = {}
+                return _entry_points
+        found = entry_points()
+        if hasattr(found, "select"):
+            found = found.select(group=ENTRY_POINT_GROUP)
+        else:
+            found = found.get(ENTRY_POINT_GROUP, [])
+        _entry_points = {entry_point.name: entry_point for entry_point in found}
+    return _entry_points
+
+
+def _lookup(name: str) -> Optional[dict]:
+    """
+    Looks up a registered transform, loading it from its entry point if it is not registered yet.
+
+    :param name: name of the transform
+    :return: the registry entry, or None if no transform of this name exists
+    """
+    if name not in _registry.keys():
+        entry_point = _discover_entry_points().get(name)
+        if entry_point is None:
+            return None
+        function = entry_point.load()
+        # Loading the module may have registered the transform along with its metadata
+        if name not in _registry.keys():
+            register_transform(name, function)
+    return _registry[name]
+
+
+def is_transform(name: str) -> bool:
+    """
+    Checks whether a transform of the given name is registered or installed as a third-party transform.
+
+    :param name: name of the transform
+    :return: whether the transform exists
+    """
+    return name in _registry.keys() or name in _discover_entry_points().keys()
+
+
+def get_transform(name: str) -> Callable:
+    """
+    Returns the function of a transform, loading third-party transforms on first use.
+
+    :param name: name of the transform
+    :return: the transform function
+    :raise ValueError: if no transform of this name exists
+    """
+    entry = _lookup(name)
+    if entry is None:
+        raise ValueError(f"Transform '{name}' not available. Available options are {list_transforms()}")
+    return entry["function"]
+
+
+def transform_order(names: Iterable[str]) -> List[str]:
+    """
+    Sorts transform names in the order they are applied.
+
+    :param names: names of transforms
+    :return: the sorted names
+    :raise ValueError: if a transform does not exist
+    """
+    entries = {name: _lookup(name) for name in names}
+    for name, entry in entries.items():
+        if entry is None:
+            raise ValueError(f"Transform '{name}' not available. Available options are {list_transforms()}")
+    return sorted(entries.keys(), key=lambda name: (entries[name]["stage"], entries[name]["index"]))
+
+
+def list_transforms() -> List[str]:
+    """
+    Returns the names of all registered and installed third-party transforms, without loading the latter.
+
+    :return: list of transform names
+    """
+    return list(dict.fromkeys([*_registry.keys(), *_discover_entry_points().keys()]))
+
+
+def run_transforms(transforms: dict, axes: list):
+    """
+    Applies transforms to axes in order. Consecutive transforms with per-axes implementations are fused into a
+    single pass per axes, sharing tick queries and applying tick and spine updates once.
+
+    :param transforms: dict of transform arguments by transform name
+    :param axes: the axes to transform
+    """
+    names = transform_order(transforms.keys())
+    for fused, group in itertools.groupby(names, key=lambda name: _registry[name]["per_axes"] is not None):
+        group = list(group)
+        if not fused:
+            for name in group:
+                _registry[name]["function"](**transforms[name], axes=axes)
+            continue
+        for ax_i in axes:
+            with AxesPass(ax_i) as axes_pass:
+                for name in group:
+                    _registry[name]["per_axes"](axes_pass, **transforms[name])
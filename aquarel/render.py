@@ -0,0 +1,228 @@
+import contextlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Union
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from .theme import Theme
+
+# Maximum number of Agg canvases kept for reuse
+_MAX_CANVASES = 8
+# Agg canvases by pixel size and dpi, reused so their render buffers are not reallocated
+_canvases = OrderedDict()
+
+
+def _resolve_figure(result):
+    """
+    Returns the figure produced by a plot function.
+
+    :param result: return value of the plot function, a figure, a tuple starting with a figure (like
+        `plt.subplots`), or None to use the current figure
+    :return: the matplotlib figure
+    """
+    if isinstance(result, tuple) and len(result) > 0:
+        result = result[0]
+    if isinstance(result, mpl.figure.Figure):
+        return result
+    return plt.gcf()
+
+
+@contextlib.contextmanager
+def _pooled_canvas(figure):
+    """
+    Attaches a pooled Agg canvas of matching size to a figure while drawing. Canvases keep their renderer, so
+    drawing a figure of the same size and dpi again reuses the pixel buffer instead of allocating a new one.
+    On exit, the figure gets its original canvas back and the pooled canvas is detached from the figure, so the
+    pool does not keep figures alive.
+
+    :param figure: the figure to draw
+    :return: context manager yielding the attached canvas
+    """
+    width, height = figure.bbox.size
+    key = (int(round(width)), int(round(height)), figure.dpi)
+    original = figure.canvas
+    canvas = _canvases.pop(key, None)
+    if canvas is None:
+        canvas = FigureCanvasAgg(figure)
+    else:
+        canvas.figure = figure
+        figure.set_canvas(canvas)
+    try:
+        yield canvas
+    finally:
+        figure.set_canvas(original)
+        canvas.figure = None
+        _canvases[key] = canvas
+        while len(_canvases) > _MAX_CANVASES:
+            _canvases.popitem(last=False)
+
+
+def draw_to_array(
+    theme: Theme,
+    figure,
+    dpi: Optional[Union[float, int]] = None,
+    copy: bool = False,
+) -> np.ndarray:
+    """
+    Draws a finished figure on a pooled Agg canvas and returns its pixels. Honors the themes' export facecolor and
+    transparency like `Theme.savefig` does.
+
+    :param theme: the theme whose export settings to use
+    :param figure: the figure to draw
+    :param dpi: resolution to draw at, default: the themes' export dpi, or the figure dpi
+    :param copy: whether to return a copy; otherwise the array is a view on the canvas buffer, which is overwritten
+        by the next draw of the same size
+    :return: RGBA array of shape (height, width, 4) and dtype uint8
+    """
+    export = theme.export_kwargs()
+    if dpi is None and export.get("dpi", "figure") != "figure":
+        dpi = export["dpi"]
+    original_dpi = figure.dpi
+    if dpi is not None:
+        figure.set_dpi(dpi)
+    # Temporarily apply the export background, as savefig does
+    patches = [figure.patch, *[ax_i.patch for ax_i in figure.axes]]
+    facecolors = [patch.get_facecolor() for patch in patches]
+    edgecolors = [patch.get_edgecolor() for patch in patches]
+    if export.get("transparent", False):
+        for patch in patches:
+            patch.set_facecolor("none")
+            patch.set_edgecolor("none")
+    elif export.get("facecolor") not in [None, "auto"]:
+        figure.patch.set_facecolor(export["facecolor"])
+    try:
+        with _pooled_canvas(figure) as canvas, theme.profiler or contextlib.nullcontext():
+            canvas.draw()
+            pixels = np.asarray(canvas.buffer_rgba())
+    finally:
+        for patch, facecolor, edgecolor in zip(patches, facecolors, edgecolors):
+            patch.set_facecolor(facecolor)
+            patch.set_edgecolor(edgecolor)
+        figure.set_dpi(original_dpi)
+    return pixels.copy() if copy else pixels
+
+
+def render_to_array(
+    theme: Theme,
+    plot_fn: Callable,
+    *args,
+    dpi: Optional[Union[float, int]] = None,
+    copy: bool = False,
+    close: bool = True,
+    **kwargs,
+) -> np.ndarray:
+    """
+    Renders a plot function under a theme directly to pixels, without encoding to an image format.
+
+    :param theme: the theme to render with
+    :param plot_fn: function that plots the figure, returning a figure, a tuple starting with a figure, or None to
+        use the current figure
+    :param args: positional arguments of the plot function
+    :param dpi: resolution to draw at, default: the themes' export dpi, or the figure dpi
+    :param copy: whether to return a copy; otherwise the array is a view on a reused canvas buffer, which is
+        overwritten by the next render of the same size
+    :param close: whether to close the figure after rendering
+    :param kwargs: keyword arguments of the plot function
+    :return: RGBA array of shape (height, width, 4) and dtype uint8
+    """
+    with theme:
+        figure = _resolve_figure(plot_fn(*args, **kwargs))
+    pixels = draw_to_array(theme, figure, dpi=dpi, copy=copy)
+    if close:
+        plt.close(figure)
+    return pixels
+
+
+def _downsample(pixels: np.ndarray, width: int, height: int) -> np.ndarray:
+    """
+    Downsamples RGBA pixels with a Lanczos filter. Colors are filtered with premultiplied alpha, so transparent
+    regions do not bleed into their surroundings.
+
+    :param pixels: RGBA array of shape (height, width, 4) and dtype uint8
+    :param width: target width in pixels
+    :param height: target height in pixels
+    :return: RGBA array of shape (height, width, 4) and dtype uint8
+    """
+    from PIL import Image
+
+    image = Image.fromarray(np.ascontiguousarray(pixels)).convert("RGBa")
+    return np.asarray(image.resize((width, height), Image.LANCZOS).convert("RGBA"))
+
+
+def draw_resolutions(
+    theme: Theme,
+    figure,
+    dpis: Iterable[Union[float, int]],
+    legible_text: Optional[float] = None,
+) -> Dict[Union[float, int], np.ndarray]:
+    """
+    Draws a finished figure at several resolutions with a single draw. The figure is drawn at the highest
+    resolution, and smaller ones are downsampled from it.
+
+    :param theme: the theme whose export settings to use
+    :param figure: the figure to draw
+    :param dpis: resolutions to draw at
+    :param legible_text: minimum height in pixels of the smallest text of the figure; resolutions at which text
+        would be smaller are drawn natively instead, as downsampling washes out small text. Default: always downsample
+    :return: dict of RGBA arrays of shape (height, width, 4) and dtype uint8 by resolution
+    """
+    dpis = sorted(set(dpis), reverse=True)
+    pixels = draw_to_array(theme, figure, dpi=dpis[0], copy=True)
+    font_size = min(
+        (text.get_fontsize() for text in figure.findobj(mpl.text.Text) if text.get_visible() and text.get_text()),
+        default=None,
+    )
+    width, height = figure.get_size_inches()
+    arrays = {dpis[0]: pixels}
+    for dpi in dpis[1:]:
+        if legible_text is not None and font_size is not None and font_size * dpi / 72 < legible_text:
+            arrays[dpi] = draw_to_array(theme, figure, dpi=dpi, copy=True)
+        else:
+            # Truncated like the pixel size of a native draw
+            arrays[dpi] = _downsample(pixels, int(width * dpi), int(height * dpi))
+    return arrays
+
+
+def save_resolutions(
+    theme: Theme,
+    figure,
+    targets: Dict[str, Union[float, int]],
+    legible_text: Optional[float] = None,
+):
+    """
+    Saves a finished figure as raster images at several resolutions with a single draw, see `draw_resolutions`.
+    The image format is inferred from the file extension. PNG compression and metadata follow the themes' export
+    settings, like `Theme.savefig`.
+
+    :param theme: the theme whose export settings to use
+    :param figure: the figure to save
+    :param targets: dict of resolutions by path to save to
+    :param legible_text: minimum height in pixels of the smallest text of the figure; resolutions at which text
+        would be smaller are drawn natively instead. Default: always downsample
+    """
+    from PIL import Image
+    from PIL.PngImagePlugin import PngInfo
+
+    arrays = draw_resolutions(theme, figure, targets.values(), legible_text=legible_text)
+    for fname, dpi in targets.items():
+        format = Path(fname).suffix.lower()[1:]
+        export = theme.export_kwargs(format)
+        image = Image.fromarray(arrays[dpi])
+        if format in ["jpg", "jpeg"]:
+            image = image.convert("RGB")
+        kwargs = {**export.get("pil_kwargs", {}), "dpi": (dpi, dpi)}
+        if format == "png":
+            # Metadata as written by matplotlib, with the keys cleared by the theme removed
+            metadata = {
+                "Software": f"Matplotlib version{mpl.__version__}, https://matplotlib.org/",
+                **export.get("metadata", {}),
+            }
+            kwargs["pnginfo"] = PngInfo()
+            for key, value in metadata.items():
+                if value is not None:
+                    kwargs["pnginfo"].add_text(key, value)
+        image.save(fname, **kwargs)
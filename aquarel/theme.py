@@ -1,11 +1,119 @@
 from typing import Union, Optional, List
-from cycler import cycler
+from cycler import cycler, Cycler
 import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib import _pylab_helpers
+import contextlib
 import warnings
+import hashlib
 import json
+import os
+import weakref
+from .lifecycle import FigureLifecycle
+from .profiler import DrawProfiler
+from .palettes import expand_palette, palette_colormap
+from .registry import is_transform, run_transforms
 from .transforms import *
 
 
+# Environment variable that enables headless mode for all themes
+HEADLESS_ENV_VAR = "AQUAREL_HEADLESS"
+
+
+def _headless_default():
+    """
+    Returns whether headless mode is enabled through the environment.
+
+    :return: True if the environment variable is set to a truthy value, False otherwise
+    """
+    return os.environ.get(HEADLESS_ENV_VAR, "").strip().lower() in ["1", "true", "yes", "on"]
+
+
+def _use_headless_backend():
+    """
+    Pins the non-interactive Agg backend. If pyplot has not resolved a backend yet, this avoids probing for GUI
+    backends altogether. Switching backends closes all figures, so with open figures of another backend, the backend
+    is left alone with a warning.
+    """
+    # Reading the rcparam directly does not resolve the backend
+    backend = dict.__getitem__(mpl.rcParams, "backend")
+    if isinstance(backend, str) and backend.lower() == "agg":
+        return
+    if len(plt.get_fignums()) > 0:
+        warnings.warn(
+            f"Headless mode cannot switch to the Agg backend while figures are open, keeping backend '{backend}'."
+        )
+        return
+    mpl.use("agg")
+
+
+def _open_figures():
+    """
+    Returns all figures managed by pyplot.
+
+    :return: list of figures
+    """
+    return [manager.canvas.figure for manager in _pylab_helpers.Gcf.get_all_fig_managers()]
+
+
+# State of each axes at the time transforms were last applied to it, with the applied transforms
+_transform_states = weakref.WeakKeyDictionary()
+
+
+def _axes_state(ax):
+    """
+    Summarizes the state of an axes that transforms depend on: limits, scales, tick locators, size and artists.
+    Tick locations are not computed, locators are compared by identity, as setting ticks replaces the locator.
+
+    :param ax: the axes
+    :return: a hashable signature
+    """
+    return (
+        ax.get_xlim(),
+        ax.get_ylim(),
+        ax.get_xscale(),
+        ax.get_yscale(),
+        id(ax.xaxis.get_major_locator()),
+        id(ax.yaxis.get_major_locator()),
+        tuple(ax.bbox.bounds),
+        tuple(ax.dataLim.bounds),
+        len(ax.lines),
+        len(ax.collections),
+        len(ax.patches),
+        len(ax.texts),
+        len(ax.images),
+        id(ax.get_legend()),
+    )
+
+
+# Palette each figure was created or last restyled with, to map cycled colors to a new palette
+_figure_palettes = weakref.WeakKeyDictionary()
+
+
+def _recolor(color, palette: list, new_palette: list):
+    """
+    Maps a color cycled from a palette to the color at the same position of another palette, keeping its alpha.
+
+    :param color: the color to map
+    :param palette: the palette the color was cycled from
+    :param new_palette: the palette to map to
+    :return: the mapped color, or None if the color is not in the palette
+    """
+    if color is None or (isinstance(color, str) and color == "none") or len(np.shape(color)) > 1:
+        return None
+    rgba = mpl.colors.to_rgba(color)
+    for index, candidate in enumerate(palette):
+        if np.allclose(mpl.colors.to_rgb(candidate), rgba[:3], atol=1e-3):
+            return mpl.colors.to_rgba(new_palette[index % len(new_palette)], rgba[3])
+    return None
+
+
+# Pin the backend on import already, before any figure is created
+if _headless_default():
+    _use_headless_backend()
+
+
 def _wrap_list_arg(arg):
     if arg is None:
         return arg
@@ -73,13 +181,60 @@ class Theme:
         "extra bold",
         "black",
     ]
-    # Mapping from aquarely keys to transform functions
-    _transform_mapping = {
-        "trim": trim,
-        "offset": offset,
-        "rotate_xlabel": rotate_xlabel,
-        "rotate_ylabel": rotate_ylabel,
+    # Options for line decimation
+    _decimate_options = ["minmax", "lttb"]
+    # Options for layout engines
+    _layout_engine_options = ["constrained", "compressed", "tight"]
+    # Options for colormaps derived from the palette
+    _colormap_kind_options = ["linear", "listed"]
+    # Options for image interpolation, as far as supported by the installed matplotlib version
+    _image_interpolation_options = [
+        option
+        for option in [
+            "auto",
+            "antialiased",
+            "none",
+            "nearest",
+            "bilinear",
+            "bicubic",
+            "spline16",
+            "spline36",
+            "hanning",
+            "hamming",
+            "hermite",
+            "kaiser",
+            "quadric",
+            "catrom",
+            "gaussian",
+            "bessel",
+            "mitchell",
+            "sinc",
+            "lanczos",
+            "blackman",
+        ]
+        if option in mpl.image.interpolations_names
+    ]
+    # Options for the stage at which images are interpolated, on the data or on the colormapped RGBA values
+    _image_interpolation_stage_options = (
+        ["auto", "data", "rgba"] if mpl.__version_info__ >= (3, 10) else ["data", "rgba"]
+    )
+    # Named image profiles, tuned for rendering speed of large arrays or for output quality
+    _image_presets = {
+        "preview": {
+            "interpolation": "nearest",
+            "resample": False,
+            "composite": True,
+            "interpolation_stage": "data",
+        },
+        "print": {
+            "interpolation": "antialiased",
+            "resample": True,
+            "composite": False,
+            "interpolation_stage": "rgba",
+        },
     }
+    # Options for scatter density rendering
+    _density_options = ["histogram", "hexbin"]
     _legend_location_options = [
         'best',
         'upper right',
@@ -94,6 +249,49 @@ class Theme:
         'center'
     ]
 
+    # Options for export formats
+    _export_format_options = ["png", "pdf", "svg", "ps", "eps", "jpg", "jpeg", "tif", "tiff", "webp"]
+    # Options for export bounding boxes
+    _export_bbox_options = ["tight", "standard"]
+    # Options for font embedding in PDF files, either Type 3 or TrueType
+    _pdf_fonttype_options = [3, 42]
+    # Options for font embedding in SVG files, either as paths or as text
+    _svg_fonttype_options = ["path", "none"]
+    # Metadata keys to clear per export format if metadata stripping is enabled
+    _export_metadata_keys = {
+        "png": ["Software"],
+        "pdf": ["Creator", "Producer", "CreationDate"],
+        "svg": ["Creator", "Date"],
+        "ps": ["Creator"],
+        "eps": ["Creator"],
+    }
+    # Named export profiles, tuned for throughput or for output size
+    _export_presets = {
+        "fast_png": {
+            "format": "png",
+            "dpi": 100,
+            "png_compression": 1,
+            "strip_metadata": True,
+        },
+        "small_png": {
+            "format": "png",
+            "dpi": 100,
+            "png_compression": 9,
+            "strip_metadata": True,
+        },
+        "web_svg": {
+            "format": "svg",
+            "svg_fonttype": "none",
+            "strip_metadata": True,
+        },
+        "print_pdf": {
+            "format": "pdf",
+            "dpi": 300,
+            "pdf_fonttype": 42,
+            "pdf_compression": 9,
+        },
+    }
+
     # Mapping from aquarel keys to matplotlib rcparams
     _rcparams_mapping = {
         "title": {
@@ -150,6 +348,8 @@ class Theme:
             "legend_border_color": ["legend.edgecolor"],
             "axes_label_color": ["axes.labelcolor"],
             "palette": "axes.prop_cycle", # This should be just a string unlike others, otherwise set_color(palette=...) won't work.
+            "palette_size": [],  # Not an rcparam, expands the palette cycler in apply()
+            "colormap": ["image.cmap"],
         },
         "axes": {
             "width": ["axes.linewidth"],
@@ -197,10 +397,48 @@ class Theme:
             "padding": ["legend.borderpad"],
             "margin": ["legend.borderaxespad"],
             "spacing": ["legend.handletextpad", "legend.labelspacing"]
-        }
+        },
+        "export": {
+            "dpi": ["savefig.dpi"],
+            "format": ["savefig.format"],
+            "bbox": ["savefig.bbox"],
+            "pad": ["savefig.pad_inches"],
+            "transparent": ["savefig.transparent"],
+            "pdf_fonttype": ["pdf.fonttype"],
+            "pdf_compression": ["pdf.compression"],
+            "svg_fonttype": ["svg.fonttype"],
+            "png_compression": [],  # Not an rcparam, passed to savefig() by export_kwargs()
+            "strip_metadata": [],  # Not an rcparam, passed to savefig() by export_kwargs()
+        },
+        "layout": {
+            "engine": ["figure.constrained_layout.use", "figure.autolayout"],
+            "pad": ["figure.constrained_layout.h_pad", "figure.constrained_layout.w_pad"],
+            "space": ["figure.constrained_layout.hspace", "figure.constrained_layout.wspace"],
+        },
+        "image": {
+            "interpolation": ["image.interpolation"],
+            "resample": ["image.resample"],
+            "composite": ["image.composite_image"],
+            "interpolation_stage": ["image.interpolation_stage"],
+        },
     }
 
-    def __init__(self, name: Optional[str] = None, description: Optional[str] = None):
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        headless: Optional[bool] = None,
+    ):
+        """
+        :param name: name of the theme
+        :param description: description of the theme
+        :param headless: whether to render without interactive machinery: pins the Agg backend when the theme is
+            applied, skips showing sample plots and closes figures after `Theme.savefig`. Default: enabled if the
+            AQUAREL_HEADLESS environment variable is set
+        """
+        self.headless = _headless_default() if headless is None else headless
+        self.lifecycle = None
+        self.profiler = None
         self.info = {}
         if name is not None:
             self.info["name"] = name
@@ -226,9 +464,28 @@ class Theme:
             indent=4,
         )
 
+    def __eq__(self, other):
+        """Themes are equal if they render identically, see `content_hash`"""
+        if not isinstance(other, Theme):
+            return NotImplemented
+        return self.content_hash() == other.content_hash()
+
+    def __hash__(self):
+        """
+        Hash based on `content_hash`. Note that modifying a theme changes its hash, so a theme that is modified while
+        used as a dict key or set member can no longer be found.
+        """
+        return int(self.content_hash()[:16], 16)
+
     def __enter__(self):
         # Save current state
         self.rcparams_orig = mpl.rcParams
+        # Remember existing figures to track the ones created within the context
+        self._figures_orig = set(_open_figures())
+        if self.lifecycle is not None:
+            self.lifecycle.enforce()
+        if self.profiler is not None:
+            self.profiler.start()
         # Apply desired state
         self.apply()
 
@@ -236,7 +493,28 @@ class Theme:
         with warnings.catch_warnings():
             warnings.simplefilter("ignore", mpl.MatplotlibDeprecationWarning)
             mpl.rcParams.update(self.rcparams_orig)
-        self.apply_transforms()
+        try:
+            figures = [figure for figure in _open_figures() if figure not in self._figures_orig]
+            # Without new figures, the plotting code drew on an existing one, which is then the current figure
+            if len(figures) == 0 and len(plt.get_fignums()) > 0:
+                figures = [plt.gcf()]
+            # The compressed layout has no rcparam, figures are created with the constrained layout and switched over
+            if self.params.get("layout", {}).get("engine") == "compressed":
+                for figure in figures:
+                    figure.set_layout_engine("compressed")
+            self.apply_transforms(figures)
+            palette = self.get_palette()
+            for figure in figures:
+                _figure_palettes[figure] = palette
+            if self.lifecycle is not None:
+                self.lifecycle.track(figures)
+                if self.lifecycle.policy == "exit":
+                    for figure in figures:
+                        self.lifecycle.close(figure)
+        finally:
+            # Stop profiling even if a transform fails, to restore the draw methods
+            if self.profiler is not None:
+                self.profiler.stop()
 
     def _update_params(self, param_key, value_dict):
         """
@@ -267,11 +545,13 @@ class Theme:
 
         :param value_dict: dictionary of transform names and args
         """
-        # Filter unset attributes and attributes not in the base transform template
+        # Filter unset attributes and transforms that are neither registered nor installed
+        for name in value_dict.keys():
+            if not is_transform(name):
+                warnings.warn(f"Transform '{name}' not available and ignored. Is the package providing it installed?")
         transforms = dict(
             filter(
-                lambda x: (x[0] in self._transform_mapping.keys())
-                and (x[1] is not None),
+                lambda x: (x[1] is not None) and is_transform(x[0]),
                 value_dict.items(),
             )
         )
@@ -299,39 +579,324 @@ class Theme:
         """
         Applies the theme
         """
+        if self.headless:
+            _use_headless_backend()
         # Clear current state
         mpl.rcParams.update(mpl.rcParamsDefault)
         # Apply desired state
+        rc = self._resolve_rcparams()
+        # Special treatment for color palette, as this is otherwise not JSON serializable
+        if type(rc.get("axes.prop_cycle")) == list:
+            rc["axes.prop_cycle"] = cycler("color", rc["axes.prop_cycle"])
+        # Skip theme parameters that map to rcparams unknown to the installed matplotlib version, like
+        # image.interpolation_stage before 3.7, while overrides are applied as given
+        mpl.rcParams.update(
+            {key: value for key, value in rc.items() if key in mpl.rcParams or key in (self.overrides or {})}
+        )
+
+    def _resolve_rcparams(self):
+        """
+        Resolves the themes' parameters and overrides to the matplotlib rcparams they set.
+        The color palette is resolved to a list of colors.
+
+        :return: dict of rcparams
+        """
+        rc = {}
         for top_key in self.params.keys():
             for key, value in self.params[top_key].items():
                 mapped_key = self._rcparams_mapping[top_key][key]
                 if type(mapped_key) == list:
                     for sub_key in mapped_key:
-                        # Special treatment for color palette, as this is otherwise not JSON serializable
-                        if mapped_key == "axes.prop_cycle":
-                            value = cycler("color", value)
-                        if sub_key == "xaxis.labellocation":
-                            if value not in ["left", "right", "center"]:
-                                value = mpl.rcParamsDefault[sub_key]
-                        elif sub_key == "yaxis.labellocation":
-                            if value not in ["top", "bottom", "center"]:
-                                value = mpl.rcParamsDefault[sub_key]
-
-                        mpl.rcParams.update({sub_key: value})
+                        if sub_key == "xaxis.labellocation" and value not in ["left", "right", "center"]:
+                            rc[sub_key] = mpl.rcParamsDefault[sub_key]
+                        elif sub_key == "yaxis.labellocation" and value not in ["top", "bottom", "center"]:
+                            rc[sub_key] = mpl.rcParamsDefault[sub_key]
+                        elif sub_key == "figure.constrained_layout.use":
+                            rc[sub_key] = value in ["constrained", "compressed"]
+                        elif sub_key == "figure.autolayout":
+                            rc[sub_key] = value == "tight"
+                        elif sub_key == "image.cmap":
+                            rc[sub_key] = self.get_colormap(value).name
+                        else:
+                            rc[sub_key] = value
+                elif mapped_key == "axes.prop_cycle":
+                    rc[mapped_key] = self.get_palette()
                 else:
-                    # Special treatment for color palette, as this is otherwise not JSON serializable
-                    if mapped_key == "axes.prop_cycle":
-                        value = cycler("color", value)
-                    mpl.rcParams.update({mapped_key: value})
+                    rc[mapped_key] = value
+        # The palette size expands the palette cycler, also if the palette is the default one
+        if "palette_size" in self.params.get("colors", {}).keys():
+            rc["axes.prop_cycle"] = self.get_palette()
         if self.overrides is not None:
-            mpl.rcParams.update(self.overrides)
+            rc.update(self.overrides)
+        return rc
+
+    def content_hash(self):
+        """
+        Returns a stable hash of everything that affects how the theme renders: the resolved rcparams including
+        overrides, parameters that are not rcparams (like export settings), and transforms.
+        The theme name and description do not contribute.
+
+        :return: hex digest
+        """
+        extra = {}
+        for top_key, values in self.params.items():
+            for key, value in values.items():
+                if self._rcparams_mapping[top_key][key] == []:
+                    extra.setdefault(top_key, {})[key] = value
+        canonical = json.dumps(
+            {
+                "rcparams": self._resolve_rcparams(),
+                "params": extra,
+                "transforms": self.transforms,
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            default=repr,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def export_kwargs(self, format: Optional[str] = None):
+        """
+        Returns the keyword arguments for `Figure.savefig` that realize the themes' export settings.
+        Settings that matplotlib only reads from rcparams, like font embedding, are applied by `Theme.savefig`.
+
+        :param format: the export format, default: the themes' format, or the matplotlib default
+        :return: dict of savefig keyword arguments
+        """
+        export = self.params.get("export", {})
+        format = format or export.get("format", mpl.rcParamsDefault["savefig.format"])
+        kwargs = {"format": format}
+        if "dpi" in export.keys():
+            kwargs["dpi"] = export["dpi"]
+        if "bbox" in export.keys():
+            kwargs["bbox_inches"] = "tight" if export["bbox"] == "tight" else None
+        if "pad" in export.keys():
+            kwargs["pad_inches"] = export["pad"]
+        if "transparent" in export.keys():
+            kwargs["transparent"] = export["transparent"]
+        if "savefig.facecolor" in self.overrides.keys():
+            kwargs["facecolor"] = self.overrides["savefig.facecolor"]
+        if format == "png" and export.get("png_compression") is not None:
+            kwargs["pil_kwargs"] = {"compress_level": export["png_compression"]}
+        if export.get("strip_metadata", False):
+            kwargs["metadata"] = {
+                key: None for key in self._export_metadata_keys.get(format, [])
+            }
+        return kwargs
 
-    def apply_transforms(self):
+    def savefig(self, figure, fname, **kwargs):
         """
-        Applies the themes' transforms
+        Saves a figure with the themes' export settings. Keyword arguments take precedence over the theme.
+        If the theme sets a layout engine, tight bounding boxes of the export settings are skipped, as the layout
+        already fits the figure.
+        In headless mode, or with a lifecycle policy of "export", the figure is closed afterwards.
+
+        :param figure: the matplotlib figure to save
+        :param fname: path or file-like object to save the figure to
+        :param kwargs: additional keyword arguments passed to `Figure.savefig`
         """
-        for transform, args in self.transforms.items():
-            self._transform_mapping[transform](**args)
+        format = kwargs.pop("format", None)
+        if format is None and isinstance(fname, (str, os.PathLike)):
+            format = os.path.splitext(fname)[1][1:].lower() or None
+        export = self.params.get("export", {})
+        rc = {}
+        for key in ["pdf_fonttype", "pdf_compression", "svg_fonttype"]:
+            if key in export.keys():
+                rc.update({sub_key: export[key] for sub_key in self._rcparams_mapping["export"][key]})
+        export_kwargs = self.export_kwargs(format)
+        # Figures laid out by the theme already fit their contents, so the second draw of a tight bbox is skipped,
+        # unless explicitly requested
+        if (
+            "engine" in self.params.get("layout", {}).keys()
+            and "bbox_inches" not in kwargs.keys()
+            and export_kwargs.get("bbox_inches") in ["tight", None]
+        ):
+            export_kwargs.pop("bbox_inches", None)
+            rc["savefig.bbox"] = "standard"
+        kwargs = {**export_kwargs, **kwargs}
+        with mpl.rc_context(rc), self.profiler or contextlib.nullcontext():
+            figure.savefig(fname, **kwargs)
+        if self.lifecycle is not None:
+            self.lifecycle.enforce()
+            if self.lifecycle.policy == "export":
+                self.lifecycle.close(figure)
+        if self.headless:
+            plt.close(figure)
+
+    def apply_transforms(self, figures: Optional[list] = None):
+        """
+        Applies the themes' transforms. All axes of the given figures, including those of subfigures, are
+        transformed together, and transforms working on ticks and spines are fused into a single pass per axes.
+        Applying the same transforms again only processes axes that were
+        added or changed in the meantime.
+
+        :param figures: figures to transform, default: the current figure
+        """
+        if len(self.transforms) == 0:
+            return
+        if figures is None:
+            figures = [plt.gcf()]
+        # Only process axes that are new, or changed since these transforms were last applied to them
+        key = json.dumps(self.transforms, sort_keys=True, default=repr)
+        axes = [
+            ax_i
+            for figure in figures
+            for ax_i in figure.axes
+            if _transform_states.get(ax_i) != (key, _axes_state(ax_i))
+        ]
+        if len(axes) == 0:
+            return
+        # Transforms that work at the output resolution, like decimate, see the themes' export dpi
+        export = self.params.get("export", {})
+        with mpl.rc_context({"savefig.dpi": export["dpi"]} if "dpi" in export.keys() else {}):
+            run_transforms(self.transforms, axes)
+        for ax_i in axes:
+            _transform_states[ax_i] = (key, _axes_state(ax_i))
+
+    def restyle(self, figure):
+        """
+        Restyles an existing figure with the theme, without re-plotting it: backgrounds, spines, grid, ticks, texts,
+        fonts and legends are updated, and data artists colored from the palette of the previous theme are
+        recolored with this themes' palette. The themes' transforms are applied afterwards.
+
+        :param figure: the figure to restyle
+        """
+        # Resolve the themes' rcparams with validation and defaults, without touching the global state
+        with mpl.rc_context():
+            self.apply()
+            rc = mpl.rcParams.copy()
+        palette = _figure_palettes.get(figure, mpl.rcParamsDefault["axes.prop_cycle"].by_key()["color"])
+        new_palette = self.get_palette()
+        font = {"family": rc["font.family"]}
+        text_color = rc["text.color"]
+
+        def recolor(artist, getter, setter):
+            colors = getter()
+            if len(np.shape(colors)) == 2 and len(colors) == 1:
+                colors = colors[0]
+            color = _recolor(colors, palette, new_palette)
+            if color is not None:
+                setter(color)
+
+        figure.patch.set_facecolor(rc["figure.facecolor"])
+        figure.patch.set_edgecolor(rc["figure.edgecolor"])
+        for text in figure.findobj(mpl.text.Text):
+            text.set_fontfamily(font["family"])
+        for subfigure in [figure, *figure.subfigs]:
+            if getattr(subfigure, "_suptitle", None) is not None:
+                subfigure._suptitle.set_color(text_color)
+                subfigure._suptitle.set_fontsize(rc["figure.titlesize"])
+                subfigure._suptitle.set_fontweight(rc["figure.titleweight"])
+        for ax_i in figure.axes:
+            ax_i.set_facecolor(rc["axes.facecolor"])
+            ax_i.set_axisbelow(rc["axes.axisbelow"])
+            for side, spine in ax_i.spines.items():
+                spine.set_edgecolor(rc["axes.edgecolor"])
+                spine.set_linewidth(rc["axes.linewidth"])
+                spine.set_visible(rc.get(f"axes.spines.{side}", True))
+            title_color = text_color if rc["axes.titlecolor"] == "auto" else rc["axes.titlecolor"]
+            for title in [ax_i.title, ax_i._left_title, ax_i._right_title]:
+                title.set_color(title_color)
+                title.set_fontsize(rc["axes.titlesize"])
+                title.set_fontweight(rc["axes.titleweight"])
+            for axis, name in [(ax_i.xaxis, "xtick"), (ax_i.yaxis, "ytick")]:
+                axis.label.set_color(rc["axes.labelcolor"])
+                axis.label.set_fontsize(rc["axes.labelsize"])
+                axis.label.set_fontweight(rc["axes.labelweight"])
+                label_color = rc[f"{name}.color"] if rc[f"{name}.labelcolor"] == "inherit" else rc[f"{name}.labelcolor"]
+                for which in ["major", "minor"]:
+                    ax_i.tick_params(
+                        axis=name[0],
+                        which=which,
+                        color=rc[f"{name}.color"],
+                        labelcolor=label_color,
+                        labelsize=rc[f"{name}.labelsize"],
+                        direction=rc[f"{name}.direction"],
+                        length=rc[f"{name}.{which}.size"],
+                        width=rc[f"{name}.{which}.width"],
+                    )
+                if rc[f"{name}.minor.visible"]:
+                    axis.minorticks_on()
+            ax_i.grid(False, which="both")
+            if rc["axes.grid"]:
+                ax_i.grid(
+                    True,
+                    which=rc["axes.grid.which"],
+                    axis=rc["axes.grid.axis"],
+                    color=rc["grid.color"],
+                    alpha=rc["grid.alpha"],
+                    linestyle=rc["grid.linestyle"],
+                    linewidth=rc["grid.linewidth"],
+                )
+            for text in ax_i.texts:
+                text.set_color(text_color)
+            for line in ax_i.lines:
+                recolor(line, line.get_color, line.set_color)
+            for artist in [*ax_i.collections, *ax_i.patches]:
+                recolor(artist, artist.get_facecolor, artist.set_facecolor)
+                recolor(artist, artist.get_edgecolor, artist.set_edgecolor)
+            legend = ax_i.get_legend()
+            if legend is not None:
+                frame = legend.get_frame()
+                frame.set_facecolor(
+                    rc["axes.facecolor"] if rc["legend.facecolor"] == "inherit" else rc["legend.facecolor"]
+                )
+                frame.set_edgecolor(
+                    rc["axes.edgecolor"] if rc["legend.edgecolor"] == "inherit" else rc["legend.edgecolor"]
+                )
+                frame.set_alpha(rc["legend.framealpha"])
+                legend.set_frame_on(rc["legend.frameon"])
+                label_color = text_color if rc["legend.labelcolor"] in [None, "None"] else rc["legend.labelcolor"]
+                for text in legend.get_texts():
+                    text.set_color(label_color)
+                    text.set_fontsize(rc["legend.fontsize"])
+                if legend.get_title().get_text():
+                    legend.get_title().set_color(text_color)
+                for handle in getattr(legend, "legend_handles", getattr(legend, "legendHandles", [])):
+                    if isinstance(handle, mpl.lines.Line2D):
+                        recolor(handle, handle.get_color, handle.set_color)
+                    elif handle is not None:
+                        recolor(handle, handle.get_facecolor, handle.set_facecolor)
+                        recolor(handle, handle.get_edgecolor, handle.set_edgecolor)
+        _figure_palettes[figure] = new_palette
+        self.apply_transforms([figure])
+
+    def get_palette(self, n: Optional[int] = None):
+        """
+        Returns the color palette of the theme, expanded by perceptual interpolation if more colors are requested.
+
+        :param n: number of colors, default: the themes' palette_size if set, else the palette length
+        :return: list of colors
+        """
+        colors = self.params.get("colors", {})
+        palette = colors.get("palette")
+        if not palette:
+            palette = mpl.rcParamsDefault["axes.prop_cycle"]
+        if isinstance(palette, Cycler):
+            palette = palette.by_key()["color"]
+        if n is None:
+            n = colors.get("palette_size") or len(palette)
+        if n <= len(palette):
+            return list(palette)[:n]
+        return expand_palette(palette, n)
+
+    def get_colormap(self, kind: str = "linear", n: Optional[int] = None):
+        """
+        Returns a colormap derived from the themes' palette. The lookup table is built once and cached, and the
+        colormap is registered with matplotlib as "aquarel_<name>" (kind "linear") or "aquarel_<name>_listed"
+        (kind "listed") on first use.
+
+        :param kind: type of colormap, "linear" for a continuous colormap, "listed" for a discrete one, can be
+            {"linear", "listed"}, default: "linear"
+        :param n: number of colormap entries, default: 256 for "linear", the palette length for "listed"
+        :return: the colormap
+        """
+        name = f"aquarel_{self.info.get('name', 'Untitled')}"
+        if kind == "listed":
+            name += "_listed"
+            if n is None:
+                n = len(self.get_palette())
+        return palette_colormap(self.get_palette(), name, kind=kind, n=n)
 
     def set_transforms(
         self,
@@ -339,6 +904,16 @@ class Theme:
         offset: Optional[int] = None,
         rotate_xlabel: Optional[int] = None,
         rotate_ylabel: Optional[int] = None,
+        decimate: Optional[str] = None,
+        rasterize: Optional[int] = None,
+        rasterize_zorder: Optional[float] = None,
+        place_legend: Optional[int] = None,
+        limit_ticks: Optional[int] = None,
+        limit_minor_ticks: Optional[int] = None,
+        thin_labels: Optional[str] = None,
+        density: Optional[int] = None,
+        density_method: Optional[str] = None,
+        **custom: Optional[dict],
     ):
         """
         Set the transforms
@@ -348,6 +923,23 @@ class Theme:
         :param rotate_xlabel: rotation of x-axis labels in degrees
         :param rotate_ylabel: rotation of y-axis labels in degrees
         :param log_axes: set log scale for the specified axes, can be {'both', 'x', 'y'}
+        :param decimate: downsamples line data to the pixel resolution of the axes, can be {"minmax", "lttb"}
+        :param rasterize: number of points or vertices above which artists are rasterized in vector outputs.
+            Rasterized artists are rendered at the export dpi, see `set_export`
+        :param rasterize_zorder: zorder below which all artists are rasterized, requires rasterize
+        :param place_legend: places legends with location "best" by estimating the least occupied location on a
+            grid of this many cells per side, which is much faster than matplotlibs' search on large data
+        :param limit_ticks: maximum number of major ticks per axis, also selects bounded locators and concise
+            formatters for date axes
+        :param limit_minor_ticks: maximum number of minor ticks per axis, requires limit_ticks, default: five times
+            limit_ticks
+        :param thin_labels: hides tick labels that would overlap, e.g. on crowded categorical axes, can be
+            {"x", "y", "both"}
+        :param density: number of points above which scatter plots are replaced by a density image at pixel
+            resolution, colored by the scatter color or colormap
+        :param density_method: how to bin dense scatter plots, requires density, can be {"histogram", "hexbin"},
+            default: "histogram"
+        :param custom: arguments of custom transforms by name, see `aquarel.registry.register_transform`
         :return: self
         """
         self._update_transforms(
@@ -360,6 +952,26 @@ class Theme:
                 "rotate_ylabel": {"degrees": rotate_ylabel}
                 if rotate_ylabel is not None
                 else None,
+                "decimate": {"method": decimate}
+                if decimate in self._decimate_options
+                else None,
+                "rasterize": {"threshold": rasterize, "zorder": rasterize_zorder}
+                if rasterize is not None
+                else None,
+                "place_legend": {"resolution": place_legend}
+                if place_legend is not None
+                else None,
+                "limit_ticks": {"major": limit_ticks, "minor": limit_minor_ticks}
+                if limit_ticks is not None
+                else None,
+                "thin_labels": {"axis": thin_labels} if thin_labels in self._axis_options else None,
+                "density": {
+                    "threshold": density,
+                    **({"method": density_method} if density_method in self._density_options else {}),
+                }
+                if density is not None
+                else None,
+                **custom,
             }
         )
         return self
@@ -492,7 +1104,8 @@ class Theme:
         tick_label_color: Optional[str] = None,
         legend_background_color: Optional[str] = None,
         legend_border_color: Optional[str] = None,
-
+        palette_size: Optional[int] = None,
+        colormap: Optional[str] = None,
     ):
         """
         Sets color options.
@@ -509,6 +1122,10 @@ class Theme:
         :param tick_label_color: the color of the tick labels
         :param legend_border_color: color of the legend border
         :param legend_background_color: color of the legend background
+        :param palette_size: number of colors to cycle through; palettes shorter than this are expanded by perceptual
+            interpolation, so plots with many hue levels stay on-theme
+        :param colormap: derive the default colormap of images and heatmaps from the palette, see `get_colormap`,
+            can be {"linear", "listed"}, default: the matplotlib default colormap
         :return: self
         """
         self._update_params(
@@ -526,6 +1143,8 @@ class Theme:
                 "legend_background_color": legend_background_color,
                 "legend_border_color": legend_border_color,
                 "palette": palette,
+                "palette_size": palette_size,
+                "colormap": colormap if colormap in self._colormap_kind_options else None,
             },
         )
         return self
@@ -745,27 +1364,194 @@ class Theme:
         )
         return self
 
+    def set_layout(
+        self,
+        engine: Optional[str] = None,
+        pad: Optional[float] = None,
+        space: Optional[float] = None,
+    ):
+        """
+        Set the layout engine of figures created with the theme. With a layout engine, `Theme.savefig` skips tight
+        bounding boxes, which would draw the figure a second time.
+
+        :param engine: the layout engine, can be {"constrained", "compressed", "tight"}
+        :param pad: padding around axes in inches, for the constrained and compressed layout
+        :param space: space between subplots as a fraction of the subplot size, for the constrained and compressed
+            layout
+        :return: self
+        """
+        self._update_params(
+            "layout",
+            {
+                "engine": engine if engine in self._layout_engine_options else None,
+                "pad": pad,
+                "space": space,
+            },
+        )
+        return self
+
+    def set_image(
+        self,
+        preset: Optional[str] = None,
+        interpolation: Optional[str] = None,
+        resample: Optional[bool] = None,
+        composite: Optional[bool] = None,
+        interpolation_stage: Optional[str] = None,
+    ):
+        """
+        Set how images, e.g. from `imshow`, are rendered. For large arrays, the "preview" preset renders several times
+        faster than the matplotlib defaults, at the cost of aliasing.
+
+        :param preset: named image profile to start from, explicit arguments take precedence, can be {"preview",
+            "print"}
+        :param interpolation: interpolation used to resample images to the output resolution, can be {"auto",
+            "antialiased", "none", "nearest", "bilinear", "bicubic", "spline16", "spline36", "hanning", "hamming",
+            "hermite", "kaiser", "quadric", "catrom", "gaussian", "bessel", "mitchell", "sinc", "lanczos",
+            "blackman"}, "auto" requires matplotlib 3.10, default: "auto"
+        :param resample: whether to use full resampling instead of the faster resampling of the renderer, default: True
+        :param composite: whether to combine multiple images on the same axes into one image in vector output,
+            default: True
+        :param interpolation_stage: whether to interpolate the data or the colormapped RGBA values, can be {"auto",
+            "data", "rgba"}, default: "auto". Requires matplotlib 3.7, "auto" requires matplotlib 3.10
+        :return: self
+        :raise ValueError: if the preset is unknown
+        """
+        if preset is not None:
+            if preset not in self._image_presets.keys():
+                raise ValueError(
+                    f"No image preset named '{preset}' found. Available options are: {list(self._image_presets.keys())}"
+                )
+            self._update_params("image", self._image_presets[preset])
+        self._update_params(
+            "image",
+            {
+                "interpolation": interpolation if interpolation in self._image_interpolation_options else None,
+                "resample": resample,
+                "composite": composite,
+                "interpolation_stage": (
+                    interpolation_stage if interpolation_stage in self._image_interpolation_stage_options else None
+                ),
+            },
+        )
+        return self
+
+    def set_export(
+        self,
+        preset: Optional[str] = None,
+        dpi: Optional[Union[float, int]] = None,
+        format: Optional[str] = None,
+        bbox: Optional[str] = None,
+        pad: Optional[float] = None,
+        transparent: Optional[bool] = None,
+        pdf_fonttype: Optional[int] = None,
+        pdf_compression: Optional[int] = None,
+        svg_fonttype: Optional[str] = None,
+        png_compression: Optional[int] = None,
+        strip_metadata: Optional[bool] = None,
+    ):
+        """
+        Set export options, used by `Theme.savefig` and `Theme.export_kwargs`.
+
+        :param preset: named export profile to start from, explicit arguments take precedence, can be {"fast_png",
+            "small_png", "web_svg", "print_pdf"}
+        :param dpi: resolution in dots per inch, default: "figure"
+        :param format: file format, can be {"png", "pdf", "svg", "ps", "eps", "jpg", "jpeg", "tif", "tiff", "webp"},
+            default: "png"
+        :param bbox: bounding box of the exported figure, "tight" trims surrounding whitespace at the cost of an
+            additional draw, can be {"tight", "standard"}, default: "standard"
+        :param pad: padding around the figure in inches if bbox is "tight", default: 0.1
+        :param transparent: whether to export with a transparent background, default: False
+        :param pdf_fonttype: type of fonts embedded in PDF files, 3 (Type 3) or 42 (TrueType), default: 3
+        :param pdf_compression: compression level of PDF files, int in range 0-9, default: 6
+        :param svg_fonttype: how text is embedded in SVG files, "path" renders glyphs as paths, "none" keeps text as
+            text, can be {"path", "none"}, default: "path"
+        :param png_compression: zlib compression level of PNG files, int in range 0-9, lower is faster, default: 6
+        :param strip_metadata: whether to omit metadata like creator and creation date from exported files,
+            default: False
+        :return: self
+        :raise ValueError: if the preset is unknown
+        """
+        if preset is not None:
+            if preset not in self._export_presets.keys():
+                raise ValueError(
+                    f"No export preset named '{preset}' found. Available options are: {list(self._export_presets.keys())}"
+                )
+            self._update_params("export", self._export_presets[preset])
+        self._update_params(
+            "export",
+            {
+                "dpi": dpi,
+                "format": format if format in self._export_format_options else None,
+                "bbox": bbox if bbox in self._export_bbox_options else None,
+                "pad": pad,
+                "transparent": transparent,
+                "pdf_fonttype": pdf_fonttype if pdf_fonttype in self._pdf_fonttype_options else None,
+                "pdf_compression": pdf_compression if pdf_compression in range(10) else None,
+                "svg_fonttype": svg_fonttype if svg_fonttype in self._svg_fonttype_options else None,
+                "png_compression": png_compression if png_compression in range(10) else None,
+                "strip_metadata": strip_metadata,
+            },
+        )
+        return self
+
+    def set_lifecycle(
+        self,
+        policy: str = "export",
+        max_figures: Optional[int] = None,
+        max_memory: Optional[int] = None,
+    ):
+        """
+        Sets the lifecycle management of figures created within the theme context. The lifecycle is a runtime
+        setting and not saved with the theme. Its usage is reported by `Theme.lifecycle.report()`.
+
+        :param policy: when to close figures, can be {"export", "exit", "budget"}. "export" closes them after
+            `Theme.savefig`, "exit" when leaving the context, and "budget" only when the budget is exceeded.
+        :param max_figures: maximum number of open figures, the oldest are closed first, default: unlimited
+        :param max_memory: maximum estimated memory of open figures in bytes, the oldest are closed first,
+            default: unlimited
+        :return: self
+        """
+        self.lifecycle = FigureLifecycle(policy=policy, max_figures=max_figures, max_memory=max_memory)
+        return self
+
+    def set_profiler(self, enabled: bool = True):
+        """
+        Enables draw profiling for figures drawn within the theme context, by `Theme.savefig` or when rendering to
+        arrays. Draw time is attributed to artist types and theme parameter categories, see
+        `Theme.profiler.report()`. The profiler is a runtime setting and not saved with the theme; while it is
+        disabled, drawing has no overhead.
+
+        :param enabled: whether to profile draws
+        :return: self
+        """
+        self.profiler = DrawProfiler() if enabled else None
+        return self
+
     @classmethod
-    def from_file(cls, filename: str):
+    def from_file(cls, filename: str, headless: Optional[bool] = None):
         """
         Initialize a theme from a theme file
 
         :param filename: file to load theme dictionary from
+        :param headless: whether to enable headless mode, default: enabled if the AQUAREL_HEADLESS environment
+            variable is set
         :return: cls
         """
         with open(filename, "r", encoding='utf8') as f:
             data = json.load(f)
-        return cls.from_dict(data)
+        return cls.from_dict(data, headless=headless)
 
     @classmethod
-    def from_dict(cls, data: dict):
+    def from_dict(cls, data: dict, headless: Optional[bool] = None):
         """
         Initialize a theme from a dictionary
 
         :param data: theme dictionary to initialize from
+        :param headless: whether to enable headless mode, default: enabled if the AQUAREL_HEADLESS environment
+            variable is set
         :return: cls
         """
-        c = cls()
+        c = cls(headless=headless)
         setattr(
             c,
             "info",
@@ -1,86 +1,706 @@
+import weakref
+from typing import Optional
+
+import matplotlib as mpl
 import matplotlib.pyplot as plt
 import numpy as np
 
+from .registry import AxesPass, register_transform
+
 
-def rotate_ylabel(degrees: int):
+def _target_axes(axes: Optional[list] = None) -> list:
+    """
+    Returns the axes a transform applies to.
+
+    :param axes: explicit list of axes, default: all axes of the current figure
+    :return: list of axes
+    """
+    return plt.gcf().axes if axes is None else axes
+
+
+def _rotate_ylabel(axes_pass: AxesPass, degrees: int):
+    """
+    Applies `rotate_ylabel` within a pass over an axes.
+    """
+    axes_pass.tick_params("y", rotation=degrees)
+
+
+@register_transform(touches=["ticks"], per_axes=_rotate_ylabel)
+def rotate_ylabel(degrees: int, axes: Optional[list] = None):
     """
     Rotates the y-labels of the current plot.
 
     :param degrees: rotation in degrees
+    :param axes: axes to apply the transform to, default: all axes of the current figure
+    """
+    for ax_i in _target_axes(axes):
+        with AxesPass(ax_i) as axes_pass:
+            _rotate_ylabel(axes_pass, degrees)
+
+
+def _rotate_xlabel(axes_pass: AxesPass, degrees: int):
+    """
+    Applies `rotate_xlabel` within a pass over an axes.
     """
-    axes = plt.gcf().axes
-    for ax_i in axes:
-        ax_i.tick_params(axis="y", rotation=degrees)
+    axes_pass.tick_params("x", rotation=degrees)
 
 
-def rotate_xlabel(degrees: int):
+@register_transform(touches=["ticks"], per_axes=_rotate_xlabel)
+def rotate_xlabel(degrees: int, axes: Optional[list] = None):
     """
     Rotates the x-labels of the current plot.
 
     :param degrees: rotation in degrees
+    :param axes: axes to apply the transform to, default: all axes of the current figure
+    """
+    for ax_i in _target_axes(axes):
+        with AxesPass(ax_i) as axes_pass:
+            _rotate_xlabel(axes_pass, degrees)
+
+
+def _offset(axes_pass: AxesPass, distance: int):
+    """
+    Applies `offset` within a pass over an axes.
     """
-    axes = plt.gcf().axes
-    for ax_i in axes:
-        ax_i.tick_params(axis="x", rotation=degrees)
+    for side in ["top", "right", "left", "bottom"]:
+        axes_pass.spine(side, position=("outward", distance))
 
 
-def offset(distance: int):
+@register_transform(touches=["spines"], per_axes=_offset)
+def offset(distance: int, axes: Optional[list] = None):
     """
     Offsets the plot spines.
     Code partly taken from https://github.com/mwaskom/seaborn/blob/563e96d3be1eaee8db8dfbccf7eed1f1c66dfd31/seaborn/utils.py#L292
 
     :param distance: offset distance int pt.
+    :param axes: axes to apply the transform to, default: all axes of the current figure
     """
-    axes = plt.gcf().axes
-    for ax_i in axes:
-        for side in ["top", "right", "left", "bottom"]:
-            ax_i.spines[side].set_position(("outward", distance))
+    for ax_i in _target_axes(axes):
+        with AxesPass(ax_i) as axes_pass:
+            _offset(axes_pass, distance)
 
 
-def trim(axis: str):
+def _trim(axes_pass: AxesPass, axis: str):
+    """
+    Applies `trim` within a pass over an axes.
+    """
+    for name, sides in [("x", ["bottom", "top"]), ("y", ["left", "right"])]:
+        if axis not in [name, "both"]:
+            continue
+        ticks_major = axes_pass.ticks(name)
+        ticks = axes_pass.ticks(name, minor=True)
+        if ticks.size:
+            # Get first and last major ticks
+            low, high = sorted(axes_pass.axis(name).get_view_interval())
+            firsttick = np.compress(ticks_major >= low, ticks_major)[0]
+            lasttick = np.compress(ticks_major <= high, ticks_major)[-1]
+            # Trim spines to tick range
+            for side in sides:
+                axes_pass.spine(side, bounds=(firsttick, lasttick))
+            # Update tick values
+            ticks = ticks.compress(ticks <= lasttick)
+            ticks = ticks.compress(ticks >= firsttick)
+            axes_pass.set_ticks(name, ticks, minor=True)
+
+
+@register_transform(touches=["ticks", "spines"], per_axes=_trim)
+def trim(axis: str, axes: Optional[list] = None):
     """
     Trims axes of a plot to first and last major tick.
     Code partly taken from https://github.com/mwaskom/seaborn/blob/563e96d3be1eaee8db8dfbccf7eed1f1c66dfd31/seaborn/utils.py#L292
 
     :param axis: axes to apply the trim to. Can be {"x", "y", "both"}.
+    :param axes: axes to apply the transform to, default: all axes of the current figure
+    """
+    for ax_i in _target_axes(axes):
+        with AxesPass(ax_i) as axes_pass:
+            _trim(axes_pass, axis)
+
+
+def _minmax_indices(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Selects the first, last, minimum and maximum point per pixel column.
+
+    :param x: pixel x-coordinates of the points
+    :param y: pixel y-coordinates of the points
+    :return: sorted indices of the selected points
+    """
+    columns = np.floor(x).astype(np.int64)
+    # Sort by column, and by value within each column
+    order = np.lexsort((y, columns))
+    sorted_columns = columns[order]
+    starts = np.flatnonzero(np.r_[True, sorted_columns[1:] != sorted_columns[:-1]])
+    ends = np.r_[starts[1:], len(order)] - 1
+    return np.unique(
+        np.concatenate(
+            [
+                order[starts],
+                order[ends],
+                np.minimum.reduceat(order, starts),
+                np.maximum.reduceat(order, starts),
+            ]
+        )
+    )
+
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Selects points with the largest-triangle-three-buckets algorithm. Requires monotonic x-coordinates.
+
+    :param x: pixel x-coordinates of the points
+    :param y: pixel y-coordinates of the points
+    :param n_out: number of points to select
+    :return: sorted indices of the selected points
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # Bucket boundaries for all points except the first and last one, which are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area)) if end > start else a
+        selected[i + 1] = a
+    return np.unique(selected)
+
+
+@register_transform(touches=["artists"])
+def decimate(method: str = "minmax", dpi: Optional[float] = None, axes: Optional[list] = None):
+    """
+    Downsamples the data of lines in the current plot to the pixel resolution of their axes.
+    Lines with markers or non-default draw styles are left untouched, as are non-finite values that break lines.
+
+    :param method: downsampling method, "minmax" keeps the first, last, minimum and maximum point per pixel column,
+        "lttb" keeps two points per pixel column chosen by the largest-triangle-three-buckets algorithm and requires
+        sorted x-values. Can be {"minmax", "lttb"}.
+    :param dpi: resolution the figure is exported at, default: the larger of the figure dpi and the "savefig.dpi"
+        rcparam, which `Theme.apply_transforms` sets to the themes' export dpi
+    :param axes: axes to apply the transform to, default: all axes of the current figure
+    """
+    for ax_i in _target_axes(axes):
+        # Resolve view limits from the full data before replacing it
+        ax_i.get_xlim()
+        figure_dpi = ax_i.figure.dpi
+        export_dpi = dpi
+        if export_dpi is None:
+            export_dpi = mpl.rcParams["savefig.dpi"]
+            export_dpi = figure_dpi if export_dpi == "figure" else max(figure_dpi, export_dpi)
+        # Pixel columns at the export resolution
+        scale = export_dpi / figure_dpi
+        for line in ax_i.get_lines():
+            if line.get_marker() not in ["None", "", " ", None] or line.get_drawstyle() != "default":
+                continue
+            xy = line.get_xydata()
+            finite = np.isfinite(xy).all(axis=1)
+            points = np.flatnonzero(finite)
+            pixels = line.get_transform().transform(xy[finite]) * scale
+            if pixels.size == 0:
+                continue
+            span = int(np.ceil(np.ptp(pixels[:, 0]))) + 1
+            if len(points) <= 4 * span:
+                continue
+            if method == "lttb" and np.all(np.diff(pixels[:, 0]) >= 0):
+                selected = _lttb_indices(pixels[:, 0], pixels[:, 1], 2 * span)
+            else:
+                selected = _minmax_indices(pixels[:, 0], pixels[:, 1])
+            keep = np.union1d(points[selected], np.flatnonzero(~finite))
+            line.set_data(xy[keep, 0], xy[keep, 1])
+
+
+def _element_count(artist) -> int:
+    """
+    Counts the drawn elements of an artist: points of lines and collection offsets, or vertices of paths.
+
+    :param artist: a line, collection or patch
+    :return: number of elements
+    """
+    if isinstance(artist, mpl.lines.Line2D):
+        return len(artist.get_xydata())
+    if isinstance(artist, mpl.collections.Collection):
+        return max(
+            len(artist.get_offsets()),
+            sum(len(path.vertices) for path in artist.get_paths()),
+        )
+    return len(artist.get_path().vertices)
+
+
+@register_transform(touches=["artists"])
+def rasterize(threshold: int = 10000, zorder: Optional[float] = None, axes: Optional[list] = None):
+    """
+    Marks heavy artists of the current plot as rasterized, so vector outputs embed them as images.
+    Axes, text and spines stay vector graphics. Rasterized artists are rendered at the export resolution.
+
+    :param threshold: number of points or path vertices above which lines, collections and patches are rasterized.
+        Patches are also rasterized if an axes holds more patches than this.
+    :param zorder: if given, all artists of an axes below this zorder are rasterized into a single image
+    :param axes: axes to apply the transform to, default: all axes of the current figure
+    """
+    for ax_i in _target_axes(axes):
+        many_patches = len(ax_i.patches) > threshold
+        for artist in [*ax_i.lines, *ax_i.collections, *ax_i.patches]:
+            if (many_patches and isinstance(artist, mpl.patches.Patch)) or _element_count(artist) > threshold:
+                artist.set_rasterized(True)
+        if zorder is not None:
+            ax_i.set_rasterization_zorder(zorder)
+
+
+# Legend positions by matplotlib location code, as lower-left corner in axes fractions given the legend width w,
+# height h and the padding px, py to the axes border. Ordered like matplotlib tries them for "best".
+_legend_anchors = {
+    1: lambda w, h, px, py: (1 - w - px, 1 - h - py),
+    2: lambda w, h, px, py: (px, 1 - h - py),
+    3: lambda w, h, px, py: (px, py),
+    4: lambda w, h, px, py: (1 - w - px, py),
+    5: lambda w, h, px, py: (1 - w - px, (1 - h) / 2),
+    6: lambda w, h, px, py: (px, (1 - h) / 2),
+    7: lambda w, h, px, py: (1 - w - px, (1 - h) / 2),
+    8: lambda w, h, px, py: ((1 - w) / 2, py),
+    9: lambda w, h, px, py: ((1 - w) / 2, 1 - h - py),
+    10: lambda w, h, px, py: ((1 - w) / 2, (1 - h) / 2),
+}
+# Last legend placement per axes, with the signature of the axes state it was computed for
+_legend_placements = weakref.WeakKeyDictionary()
+
+
+def _axes_points(ax) -> np.ndarray:
+    """
+    Collects the data points of the lines, collections and patches of an axes in axes coordinates.
+
+    :param ax: the axes
+    :return: array of shape (N, 2)
+    """
+    to_axes = ax.transAxes.inverted()
+    points = [np.empty((0, 2))]
+    for line in ax.get_lines():
+        points.append((line.get_transform() + to_axes).transform(line.get_xydata()))
+    for collection in ax.collections:
+        offsets = collection.get_offsets()
+        if len(offsets) > 0:
+            points.append((collection.get_offset_transform() + to_axes).transform(offsets))
+        if len(offsets) <= 1:
+            transform = collection.get_transform() + to_axes
+            points.extend(transform.transform(path.vertices) for path in collection.get_paths())
+    for patch in ax.patches:
+        points.append((patch.get_transform() + to_axes).transform(patch.get_path().vertices))
+    points = np.concatenate(points)
+    return points[np.isfinite(points).all(axis=1)]
+
+
+def _legend_signature(ax, legend) -> tuple:
+    """
+    Summarizes the axes state that a legend placement depends on.
+
+    :param ax: the axes
+    :param legend: the legend of the axes
+    :return: a hashable signature
+    """
+    return (
+        id(legend),
+        len(ax.lines),
+        len(ax.collections),
+        len(ax.patches),
+        tuple(ax.dataLim.bounds),
+        ax.get_xlim(),
+        ax.get_ylim(),
+        tuple(ax.bbox.size),
+    )
+
+
+def _legend_uses_best(legend) -> bool:
+    """
+    Returns whether a legend uses the "best" location. Matplotlib has no public getter for the location, so it is
+    read through a public `get_loc` where available and the location attribute otherwise, falling back to the
+    "legend.loc" rcparam.
+
+    :param legend: the legend
+    :return: whether the location is "best"
+    """
+    getter = getattr(legend, "get_loc", None)
+    loc = getter() if callable(getter) else getattr(legend, "_loc", None)
+    if loc is None:
+        loc = mpl.rcParams["legend.loc"]
+    return loc == "best" or (isinstance(loc, int) and loc == mpl.legend.Legend.codes["best"])
+
+
+def _set_legend_loc(legend, code: int):
+    """
+    Sets the location of a legend, through the public `set_loc` where available (matplotlib 3.8 and later).
+
+    :param legend: the legend
+    :param code: the location code
+    """
+    if hasattr(legend, "set_loc"):
+        legend.set_loc(code)
+    else:
+        legend._loc = code
+
+
+@register_transform(touches=["legend"])
+def place_legend(resolution: int = 16, axes: Optional[list] = None):
+    """
+    Places legends of the current plot that use the "best" location in the least occupied of the standard locations.
+    Occupancy is estimated from a coarse grid over the data points instead of matplotlibs' exact search, which scales
+    with the number of data points. Placements are cached per axes until its data or limits change.
+
+    :param resolution: number of grid cells along each side of the axes
+    :param axes: axes to apply the transform to, default: all axes of the current figure
+    """
+    for ax_i in _target_axes(axes):
+        legend = ax_i.get_legend()
+        if legend is None:
+            continue
+        cached = _legend_placements.get(ax_i)
+        # Legends placed earlier are re-evaluated, any other fixed location is respected
+        if not _legend_uses_best(legend) and (cached is None or cached[0][0] != id(legend)):
+            continue
+        signature = _legend_signature(ax_i, legend)
+        if cached is not None and cached[0] == signature:
+            code = cached[1]
+        else:
+            points = _axes_points(ax_i)
+            grid, _, _ = np.histogram2d(
+                points[:, 0], points[:, 1], bins=resolution, range=[[0, 1], [0, 1]]
+            )
+            edges = np.linspace(0, 1, resolution + 1)
+            # Legend extent and padding in axes fractions
+            axes_box = ax_i.bbox
+            # Measure with a fixed location, as measuring at "best" runs matplotlibs' search this transform replaces
+            _set_legend_loc(legend, mpl.legend.Legend.codes["upper right"])
+            try:
+                extent = legend.get_window_extent(ax_i.figure.canvas.get_renderer())
+                width, height = extent.width / axes_box.width, extent.height / axes_box.height
+            except AttributeError:
+                width, height = 0.3, 0.3
+            pad = legend.borderaxespad * legend.prop.get_size_in_points() * ax_i.figure.dpi / 72
+            pad_x, pad_y = pad / axes_box.width, pad / axes_box.height
+            occupancy = []
+            for anchor in _legend_anchors.values():
+                x0, y0 = anchor(width, height, pad_x, pad_y)
+                # Fraction of each grid cell covered by the candidate box along either axis
+                cover_x = np.clip(np.minimum(edges[1:], x0 + width) - np.maximum(edges[:-1], x0), 0, None)
+                cover_y = np.clip(np.minimum(edges[1:], y0 + height) - np.maximum(edges[:-1], y0), 0, None)
+                occupancy.append(cover_x @ grid @ cover_y)
+            code = list(_legend_anchors.keys())[int(np.argmin(occupancy))]
+        _set_legend_loc(legend, code)
+        _legend_placements[ax_i] = (signature, code)
+
+
+def _limited_log_minor_locator(axis, minor: int) -> mpl.ticker.LogLocator:
+    """
+    Returns a minor locator for a logarithmic axis with at most about `minor` ticks, spreading a subset of the
+    multiples of each decade evenly, or placing ticks at decades skipped by the major ticks if even one multiple
+    per decade is too many.
+
+    :param axis: the logarithmic axis
+    :param minor: maximum number of minor ticks
+    :return: the locator
+    """
+    base = getattr(axis.get_transform(), "base", 10)
+    low, high = sorted(axis.get_view_interval())
+    decades = max(1, int(np.ceil(abs(np.log(high / low) / np.log(base))))) if low > 0 else 1
+    multiples = np.arange(2, int(base)) if base > 2 else np.array([])
+    per_decade = min(minor // decades, len(multiples))
+    if per_decade >= 1:
+        subs = multiples[np.unique(np.linspace(0, len(multiples) - 1, per_decade).round().astype(int))]
+        return mpl.ticker.LogLocator(base=base, subs=subs)
+    return mpl.ticker.LogLocator(base=base, subs=(1.0,), numticks=max(2, minor))
+
+
+def _limit_axis_ticks(axes_pass: AxesPass, name: str, major: int, minor: int):
+    """
+    Caps the number of major and minor ticks of one axis by adjusting or replacing its locators.
+
+    :param axes_pass: the pass over the axes
+    :param name: {"x", "y"}
+    :param major: maximum number of major ticks
+    :param minor: maximum number of minor ticks
+    """
+    axis = axes_pass.axis(name)
+    locator = axis.get_major_locator()
+    if isinstance(locator, mpl.dates.AutoDateLocator):
+        if not (isinstance(locator.maxticks, int) and locator.maxticks <= major):
+            # Date locators are replaced as a whole, along with the formatter for a compact label layout
+            date_locator = mpl.dates.AutoDateLocator(
+                tz=locator.tz, minticks=min(3, major), maxticks=major,
+                interval_multiples=locator.interval_multiples,
+            )
+            axis.set_major_locator(date_locator)
+            if isinstance(axis.get_major_formatter(), mpl.dates.AutoDateFormatter):
+                axis.set_major_formatter(mpl.dates.ConciseDateFormatter(date_locator))
+    elif isinstance(locator, mpl.ticker.MaxNLocator):
+        # Locators that already produce few enough ticks keep their settings
+        if len(axes_pass.ticks(name)) > major:
+            locator.set_params(nbins=max(1, major - 1))
+    elif isinstance(locator, mpl.ticker.LogLocator):
+        locator.set_params(numticks=major)
+    elif isinstance(locator, mpl.ticker.FixedLocator) and len(locator.locs) > major:
+        locator.set_params(nbins=major)
+    axes_pass.invalidate(name)
+    if len(axes_pass.ticks(name, minor=True)) > minor:
+        intervals = max(1, len(axes_pass.ticks(name)) - 1)
+        subdivisions = minor // intervals + 1
+        if axis.get_scale() == "linear" and subdivisions >= 2:
+            axis.set_minor_locator(mpl.ticker.AutoMinorLocator(subdivisions))
+        elif axis.get_scale() == "log":
+            axis.set_minor_locator(_limited_log_minor_locator(axis, minor))
+        else:
+            axis.set_minor_locator(mpl.ticker.NullLocator())
+        axes_pass.invalidate(name)
+
+
+def _limit_ticks(axes_pass: AxesPass, major: int = 10, minor: Optional[int] = None):
+    """
+    Applies `limit_ticks` within a pass over an axes.
+    """
+    minor = 5 * major if minor is None else minor
+    for name in ["x", "y"]:
+        _limit_axis_ticks(axes_pass, name, major, minor)
+
+
+@register_transform(touches=["ticks"], per_axes=_limit_ticks)
+def limit_ticks(major: int = 10, minor: Optional[int] = None, axes: Optional[list] = None):
+    """
+    Caps the number of ticks per axis of the current plot, so wide, logarithmic or date axes never produce
+    thousands of ticks. Date axes are given a bounded date locator and a concise formatter.
+
+    :param major: maximum number of major ticks per axis
+    :param minor: maximum number of minor ticks per axis, default: five times the major ticks
+    :param axes: axes to apply the transform to, default: all axes of the current figure
+    """
+    for ax_i in _target_axes(axes):
+        with AxesPass(ax_i) as axes_pass:
+            _limit_ticks(axes_pass, major, minor)
+
+
+class _ThinnedFormatter(mpl.ticker.Formatter):
+    """
+    Wraps a tick formatter and blanks the labels of all ticks except the kept ones.
+    """
+
+    def __init__(self, formatter: mpl.ticker.Formatter, kept: np.ndarray):
+        """
+        :param formatter: the formatter to wrap
+        :param kept: locations of the ticks whose labels are kept
+        """
+        self.formatter = formatter
+        self.kept = kept
+
+    def _keep(self, values) -> np.ndarray:
+        values = np.asarray(values, dtype=float).reshape(-1, 1)
+        return np.isclose(values, self.kept.reshape(1, -1), rtol=1e-9, atol=0).any(axis=1)
+
+    def set_axis(self, axis):
+        super().set_axis(axis)
+        self.formatter.set_axis(axis)
+
+    def set_locs(self, locs):
+        self.formatter.set_locs(locs)
+
+    def get_offset(self):
+        return self.formatter.get_offset()
+
+    def __call__(self, x, pos=None):
+        return self.formatter(x, pos) if self._keep([x])[0] else ""
+
+    def format_ticks(self, values):
+        labels = self.formatter.format_ticks(values)
+        return [label if keep else "" for label, keep in zip(labels, self._keep(values))]
+
+
+# Thinning decisions by axis, as signature of the axis layout and locations of the kept labels
+_thinned_axes = weakref.WeakKeyDictionary()
+
+
+def _thin_axis(axes_pass: AxesPass, name: str, pad: float):
+    """
+    Blanks tick labels of one axis that would overlap with their neighbours, keeping every k-th label for the
+    smallest stride k without overlaps.
+
+    :param axes_pass: the pass over the axes
+    :param name: {"x", "y"}
+    :param pad: minimum space between labels in pt
+    """
+    axis = axes_pass.axis(name)
+    formatter = axis.get_major_formatter()
+    base = formatter.formatter if isinstance(formatter, _ThinnedFormatter) else formatter
+    low, high = sorted(axis.get_view_interval())
+    locs = np.asarray(axes_pass.ticks(name), dtype=float)
+    locs = np.sort(locs[(locs >= low) & (locs <= high)])
+    label = axis.majorTicks[0].label1
+    rotation = axes_pass.label_rotation(name)
+    figure = axis.axes.figure
+    signature = (
+        locs.tobytes(), tuple(axis.axes.bbox.bounds), figure.dpi, rotation,
+        label.get_fontsize(), pad, id(base),
+    )
+    cached = _thinned_axes.get(axis)
+    if cached is not None and cached[0] == signature:
+        kept = cached[1]
+    else:
+        base.set_axis(axis)
+        base.set_locs(locs)
+        # Measure each label once, without laying it out on the figure
+        prop = label.get_fontproperties()
+        sizes = np.array(
+            [
+                mpl.textpath.text_to_path.get_text_width_height_descent(text, prop, ismath=False)[:2]
+                if text
+                else (0.0, 0.0)
+                for text in base.format_ticks(locs)
+            ],
+            dtype=float,
+        ).reshape(-1, 2) * figure.dpi / 72
+        # Extent of each (possibly rotated) label along the axis, and position of its center in pixels
+        angle = np.deg2rad(rotation)
+        if axis.axis_name == "x":
+            extents = sizes[:, 0] * np.abs(np.cos(angle)) + sizes[:, 1] * np.abs(np.sin(angle))
+            length = axis.axes.bbox.width
+        else:
+            extents = sizes[:, 0] * np.abs(np.sin(angle)) + sizes[:, 1] * np.abs(np.cos(angle))
+            length = axis.axes.bbox.height
+        scaled = axis.get_transform().transform(np.concatenate([locs, [low, high]]))
+        centers = (scaled[:-2] - scaled[-2]) / (scaled[-1] - scaled[-2]) * length
+        gap = pad * figure.dpi / 72
+        stride = 1
+        while stride < len(locs):
+            half = extents[::stride] / 2
+            if np.all(np.diff(centers[::stride]) >= half[:-1] + half[1:] + gap):
+                break
+            stride += 1
+        kept = locs[::stride] if stride > 1 else None
+        _thinned_axes[axis] = (signature, kept)
+    if kept is None:
+        if formatter is not base:
+            axis.set_major_formatter(base)
+    elif formatter is base or not np.array_equal(formatter.kept, kept):
+        axis.set_major_formatter(_ThinnedFormatter(base, kept))
+
+
+def _thin_labels(axes_pass: AxesPass, axis: str = "both", pad: float = 2):
+    """
+    Applies `thin_labels` within a pass over an axes.
+    """
+    for name in ["x", "y"]:
+        if axis in [name, "both"]:
+            _thin_axis(axes_pass, name, pad)
+
+
+@register_transform(touches=["ticks"], per_axes=_thin_labels)
+def thin_labels(axis: str = "both", pad: float = 2, axes: Optional[list] = None):
+    """
+    Hides tick labels that would overlap at the current figure size and dpi, e.g. on crowded categorical axes.
+    Every k-th label is kept, for the smallest k without overlaps; label extents are measured once per axis layout.
+
+    :param axis: axes to thin the tick labels of. Can be {"x", "y", "both"}.
+    :param pad: minimum space between labels in pt
+    :param axes: axes to apply the transform to, default: all axes of the current figure
+    """
+    for ax_i in _target_axes(axes):
+        with AxesPass(ax_i) as axes_pass:
+            _thin_labels(axes_pass, axis, pad)
+
+
+def _collection_color(collection) -> Optional[tuple]:
+    """
+    Returns the single color of a scatter collection: its face color, or its edge color for hollow markers.
+
+    :param collection: the scatter collection
+    :return: RGBA color, or None if the points have different colors or no color
+    """
+    for colors in [collection.get_facecolor(), collection.get_edgecolor()]:
+        colors = np.asarray(colors).reshape(-1, 4)
+        if len(colors) > 0:
+            return tuple(colors[0]) if np.all(colors == colors[0]) else None
+    return None
+
+
+def _densify_collection(ax, collection, method: str):
+    """
+    Replaces the points of a scatter collection by a binned density image or hexbin, and empties the collection so
+    it remains as a legend entry.
+
+    :param ax: the axes of the collection
+    :param collection: the scatter collection
+    :param method: {"histogram", "hexbin"}
+    """
+    xlim, ylim = ax.get_xlim(), ax.get_ylim()
+    points = np.asarray(collection.get_offsets())
+    if collection.get_offset_transform() is not ax.transData:
+        points = ax.transData.inverted().transform(collection.get_offset_transform().transform(points))
+    values = collection.get_array()
+    if values is not None:
+        values = np.broadcast_to(np.ravel(values), len(points))
+        cmap, norm = collection.get_cmap(), collection.norm
+    else:
+        # Single-colored scatters fade from transparent to their color with increasing density
+        color = _collection_color(collection)
+        cmap = mpl.colors.LinearSegmentedColormap.from_list(
+            "density", [(*color[:3], color[3] * 0.2), color]
+        )
+        norm = mpl.colors.LogNorm()
+    (x0, x1), (y0, y1) = sorted(xlim), sorted(ylim)
+    width, height = int(ax.bbox.width), int(ax.bbox.height)
+    if method == "hexbin":
+        artist = ax.hexbin(
+            points[:, 0], points[:, 1], C=values, gridsize=(max(1, width // 8), max(1, height // 14)),
+            extent=(x0, x1, y0, y1), mincnt=1, cmap=cmap, norm=norm, linewidths=0,
+        )
+    else:
+        # Bin at pixel resolution with integer arithmetic, which is much faster than np.histogram2d
+        ix = np.floor((points[:, 0] - x0) / (x1 - x0) * width)
+        iy = np.floor((points[:, 1] - y0) / (y1 - y0) * height)
+        inside = (ix >= 0) & (ix < width) & (iy >= 0) & (iy < height)
+        index = (iy[inside] * width + ix[inside]).astype(np.intp)
+        counts = np.bincount(index, minlength=width * height).astype(float)
+        if values is not None:
+            image = np.bincount(index, weights=np.asarray(values, dtype=float)[inside], minlength=width * height)
+            image = image / np.where(counts > 0, counts, 1)
+        else:
+            image = counts
+        image = np.ma.masked_where(counts == 0, image).reshape(height, width)
+        artist = ax.imshow(
+            image, extent=(x0, x1, y0, y1), origin="lower", aspect="auto", interpolation="nearest", cmap=cmap,
+            norm=norm,
+        )
+    artist.set_zorder(collection.get_zorder())
+    artist.set_alpha(collection.get_alpha())
+    ax.set_xlim(xlim)
+    ax.set_ylim(ylim)
+    # The emptied collection keeps its label and style for legends
+    collection.set_offsets(np.empty((0, 2)))
+    if values is not None:
+        collection.set_facecolor(cmap(norm(np.mean(values))))
+        collection.set_array(None)
+
+
+@register_transform(touches=["artists"])
+def density(threshold: int = 100000, method: str = "histogram", axes: Optional[list] = None):
+    """
+    Replaces scatter plots with more points than a threshold by a density image binned at pixel resolution, or a
+    hexbin, colored by the scatter color or colormap. Axes limits and legend entries are kept, so the render cost
+    depends on the number of pixels rather than points. Scatters with individually colored points, other than by a
+    colormap, are left untouched.
+
+    :param threshold: number of points above which a scatter is replaced
+    :param method: {"histogram", "hexbin"}
+    :param axes: axes to apply the transform to, default: all axes of the current figure
     """
-    # Apply trim to all axes
-    for ax_i in plt.gcf().axes:
-        if axis in ["x", "both"]:
-            # Trim x direction (bottom and top)
-            xticks_major = np.asarray(ax_i.get_xticks(minor=False))
-            xticks = np.asarray(ax_i.get_xticks(minor=True))
-            if xticks.size:
-                # Get first and last major ticks
-                firsttick = np.compress(
-                    xticks_major >= min(ax_i.get_xlim()), xticks_major
-                )[0]
-                lasttick = np.compress(
-                    xticks_major <= max(ax_i.get_xlim()), xticks_major
-                )[-1]
-                # Trim spines to tick range
-                ax_i.spines["bottom"].set_bounds(firsttick, lasttick)
-                ax_i.spines["top"].set_bounds(firsttick, lasttick)
-                # Update tick values for both minor and major ticks
-                xticks = xticks.compress(xticks <= lasttick)
-                xticks = xticks.compress(xticks >= firsttick)
-                ax_i.set_xticks(xticks, minor=True)
-        if axis in ["y", "both"]:
-            # Trim y direction (left and right)
-            yticks_major = np.asarray(ax_i.get_yticks(minor=False))
-            yticks = np.asarray(ax_i.get_yticks(minor=True))
-            if yticks.size:
-                # Get first and last major ticks
-                firsttick = np.compress(
-                    yticks_major >= min(ax_i.get_ylim()), yticks_major
-                )[0]
-                lasttick = np.compress(
-                    yticks_major <= max(ax_i.get_ylim()), yticks_major
-                )[-1]
-                # Trim spines to tick range
-                ax_i.spines["left"].set_bounds(firsttick, lasttick)
-                ax_i.spines["right"].set_bounds(firsttick, lasttick)
-                # Update tick values
-                newticks = yticks.compress(yticks <= lasttick)
-                newticks = newticks.compress(newticks >= firsttick)
-                ax_i.set_yticks(newticks, minor=True)
+    for ax_i in _target_axes(axes):
+        if ax_i.get_xscale() != "linear" or ax_i.get_yscale() != "linear":
+            continue
+        for collection in list(ax_i.collections):
+            if not isinstance(collection, mpl.collections.PathCollection) or len(collection.get_offsets()) <= threshold:
+                continue
+            if collection.get_array() is None and _collection_color(collection) is None:
+                continue
+            _densify_collection(ax_i, collection, method)
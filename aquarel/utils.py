@@ -11,17 +11,19 @@ HERE = Path(__file__).parent.resolve()
 ASSETS_DIR = HERE.parent / "assets"
 
 
-def load_theme(theme_name: str):
+def load_theme(theme_name: str, headless: Optional[bool] = None):
     """
     Sets the chosen style and color palette globally.
 
     :param theme_name: name of the theme to load
+    :param headless: whether to enable headless mode, which pins the non-interactive Agg backend, default: enabled
+        if the AQUAREL_HEADLESS environment variable is set
     :return: the specified Theme
     :raise ValueError: if a theme is not found
     """
     themes = _get_themes()
     if theme_name in themes.keys():
-        return Theme.from_file(themes[theme_name])
+        return Theme.from_file(themes[theme_name], headless=headless)
     else:
         raise ValueError(f"No theme named '{theme_name}' found. Available options are: {list(_get_themes().keys())}")
 
@@ -96,28 +98,21 @@ def _sample_plot(
         theme = load_theme(theme)
     else:
         name = theme.info.get("name", "Untitled")
+    # Sample plots default to a small, tightly cropped export unless the theme specifies otherwise
+    export = theme.params.get("export", {})
+    kwargs = {}
+    if "dpi" not in export.keys():
+        kwargs["dpi"] = 75
+    # Themes with a layout engine already fit the figure, see `Theme.savefig`
+    if "bbox" not in export.keys() and "engine" not in theme.params.get("layout", {}).keys():
+        kwargs["bbox_inches"] = "tight"
     with theme:
         fig, _ = make_graph()
-        transparent = theme.params.get('savefig.transparent', False)
-        facecolor = theme.params.get('savefig.facecolor', None)
-        if save_as is not None:
-            fig.savefig(
-                save_as,
-                dpi=75,
-                bbox_inches="tight",
-                facecolor=facecolor,
-                transparent=transparent,
-            )
-        else:
-            outfile = Path(ASSETS_DIR).joinpath(f'{name}.png')
-            plt.savefig(
-                outfile.as_posix(),
-                dpi=75,
-                bbox_inches="tight",
-                facecolor=facecolor,
-                transparent=transparent,
-            )
-        plt.show()
+        if save_as is None:
+            save_as = Path(ASSETS_DIR).joinpath(f'{name}.png').as_posix()
+        theme.savefig(fig, save_as, **kwargs)
+        if not theme.headless:
+            plt.show()
 
 
 def make_samples():
@@ -125,4 +120,4 @@ def make_samples():
     Generates sample plots for all themes to be used in documentation
     """
     for theme in list_themes():
-        _sample_plot(theme, f"assets/{theme}.png")
+        _sample_plot(load_theme(theme).set_lifecycle("export"), f"assets/{theme}.png")
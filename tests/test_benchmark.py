@@ -0,0 +1,26 @@
+import unittest
+from aquarel import Theme
+from aquarel.benchmark import benchmark_themes, format_report
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_benchmark_themes(self):
+        theme = Theme(name="test", headless=True)
+        reports = benchmark_themes([theme, "minimal_light"], sizes=[100], backends=["agg", "svg"], time_budget=0)
+        self.assertEqual(["test", "minimal_light"], list(reports.keys()))
+        self.assertEqual(4 * 2, len(reports["test"]["runs"]))
+        for report in reports.values():
+            self.assertTrue(report["over_budget"])
+            self.assertGreater(report["peak_memory"], 0)
+            self.assertGreater(report["output_size"], 0)
+        # Raster runs include the pixel buffer of the renderer, at 100 dpi for the 6x4 inch figure
+        for run in reports["test"]["runs"]:
+            if run["backend"] == "agg":
+                self.assertGreaterEqual(run["peak_memory"], 600 * 400 * 4)
+        self.assertIn("minimal_light", format_report(reports))
+        with self.assertRaises(ValueError):
+            benchmark_themes([theme], workloads=["pie"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+import numpy as np
+import matplotlib.pyplot as plt
+from aquarel import Theme, load_theme
+from aquarel.cache import RenderCache
+
+
+def line_plot(values):
+    fig, ax = plt.subplots()
+    ax.plot(values)
+    return fig, ax
+
+
+class TestCache(unittest.TestCase):
+    def test_content_hash(self):
+        self.assertEqual(load_theme("scientific"), load_theme("scientific"))
+        self.assertEqual(hash(load_theme("scientific")), hash(load_theme("scientific")))
+        self.assertEqual(Theme(name="a"), Theme(name="b"))
+        self.assertNotEqual(load_theme("scientific"), load_theme("scientific").set_grid(width=3))
+        self.assertNotEqual(Theme(), Theme().set_transforms(trim="both"))
+        self.assertNotEqual(Theme(), Theme().set_export(png_compression=1))
+
+    def test_render_cache(self):
+        theme = load_theme("umbra_light", headless=True)
+        values = np.random.default_rng(0).normal(size=100)
+        with tempfile.TemporaryDirectory() as directory:
+            cache = RenderCache(directory=directory)
+            for format in ["svg", "pdf", "png"]:
+                first = cache.render(theme, line_plot, values, format=format)
+                cache.clear()
+                self.assertEqual(first, cache.render(theme, line_plot, values, format=format))
+            self.assertEqual(first, cache.render(theme, line_plot, values, format="png"))
+            self.assertEqual(1, cache.stats["hits"])
+            self.assertEqual(first, RenderCache(directory=directory).get(cache.key(theme, line_plot, (values,), {}, "png")))
+            cache.render(theme, line_plot, values + 1, format="png")
+            self.assertEqual(7, cache.stats["misses"])
+
+    def test_closure_key(self):
+        def make(k, scale=1):
+            def plot(offset=k):
+                fig, ax = plt.subplots()
+                ax.plot([0, k * scale + offset])
+                return fig
+            return plot
+
+        theme = Theme()
+        cache = RenderCache()
+        self.assertEqual(cache.key(theme, make(1)), cache.key(theme, make(1)))
+        self.assertNotEqual(cache.key(theme, make(1)), cache.key(theme, make(100)))
+        self.assertNotEqual(cache.key(theme, make(1)), cache.key(theme, make(1, scale=2)))
+
+    def test_key_across_processes(self):
+        script = (
+            "from aquarel import Theme\n"
+            "from aquarel.cache import RenderCache\n"
+            "def plot(ax):\n"
+            "    ax.plot([i * i for i in range(3)], label=(lambda: 'squares')())\n"
+            "    return 'x' in {'x', 'y'}\n"
+            "print(RenderCache().key(Theme(), plot))\n"
+        )
+        keys = {
+            subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+            for _ in range(2)
+        }
+        self.assertEqual(1, len(keys))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+from aquarel import ipython
+
+
+class TestIPython(unittest.TestCase):
+    def setUp(self):
+        try:
+            from IPython.core.interactiveshell import InteractiveShell
+        except ImportError:
+            self.skipTest("IPython is not installed")
+        self.shell = InteractiveShell.instance()
+        self.shell.run_line_magic("load_ext", "aquarel")
+
+    def tearDown(self):
+        self.shell.run_line_magic("unload_ext", "aquarel")
+        plt.close("all")
+
+    def test_magic(self):
+        self.shell.run_line_magic("aquarel", "arctic_dark")
+        theme = ipython.active_theme()
+        self.assertEqual("arctic_dark", theme.info["name"])
+        theme.set_transforms(offset=7)
+        self.shell.run_cell("import matplotlib.pyplot as plt\nfig, ax = plt.subplots()")
+        fig = self.shell.user_ns["fig"]
+        self.assertEqual(("outward", 7), fig.axes[0].spines["left"].get_position())
+        self.assertEqual(mpl.colors.to_rgba(theme.params["colors"]["figure_background_color"]),
+                         fig.patch.get_facecolor())
+        # Theme changes are re-applied before the next cell, unchanged themes are not
+        theme.set_color(figure_background_color="#123456")
+        self.shell.run_cell("pass")
+        self.assertEqual("#123456", mpl.rcParams["figure.facecolor"])
+        mpl.rcParams["figure.facecolor"] = "#ffffff"
+        self.shell.run_cell("pass")
+        self.assertEqual("#ffffff", mpl.rcParams["figure.facecolor"])
+        # Applying transforms keeps the current figure
+        self.shell.run_cell("second = plt.figure()")
+        self.shell.run_cell("plt.figure(fig.number)")
+        self.shell.run_cell("current = plt.gcf()")
+        self.assertIs(fig, self.shell.user_ns["current"])
+        self.shell.run_line_magic("aquarel", "off")
+        self.assertIsNone(ipython.active_theme())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import io
+import unittest
+import numpy as np
+import matplotlib.pyplot as plt
+from aquarel import Theme
+
+
+class TestLifecycle(unittest.TestCase):
+    def setUp(self):
+        plt.close("all")
+        self.theme = Theme(name="test")
+
+    def tearDown(self):
+        plt.close("all")
+
+    def test_export_policy(self):
+        self.theme.set_lifecycle("export")
+        for _ in range(3):
+            with self.theme:
+                fig, ax = plt.subplots()
+                ax.plot(np.arange(1000))
+            self.theme.savefig(fig, io.BytesIO(), format="png")
+        self.assertEqual(0, len(plt.get_fignums()))
+        report = self.theme.lifecycle.report()
+        self.assertEqual(3, report["closed"])
+        self.assertEqual(1, report["peak_figures"])
+        self.assertGreater(report["peak_memory"], 0)
+
+    def test_exit_policy(self):
+        with self.theme.set_lifecycle("exit"):
+            plt.subplots()
+        self.assertEqual(0, len(plt.get_fignums()))
+
+    def test_budget(self):
+        self.theme.set_lifecycle("budget", max_figures=2)
+        figures = []
+        for _ in range(4):
+            with self.theme:
+                figures.append(plt.figure())
+        self.assertEqual([figure.number for figure in figures[2:]], plt.get_fignums())
+        with self.assertRaises(ValueError):
+            self.theme.set_lifecycle("never")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+from aquarel import Theme, list_themes, load_theme
+from aquarel.palettes import analyze_palettes, contrast_ratio, delta_e, expand_palette, to_linear_rgb
+
+
+class TestPalettes(unittest.TestCase):
+    def test_contrast_ratio(self):
+        black, white = to_linear_rgb(np.array([[0, 0, 0], [1, 1, 1]]))
+        self.assertAlmostEqual(21.0, contrast_ratio(black, white))
+        self.assertAlmostEqual(1.0, contrast_ratio(white, white))
+
+    def test_delta_e(self):
+        # Reference pairs from Sharma et al. (2005)
+        lab_1 = np.array([[50, 2.6772, -79.7751], [50, 0, 0], [60.2574, -34.0099, 36.2677]])
+        lab_2 = np.array([[50, 0, -82.7485], [50, -1, 2], [60.4626, -34.1751, 39.4387]])
+        np.testing.assert_allclose(delta_e(lab_1, lab_2), [2.0425, 2.3669, 1.2644], atol=1e-4)
+
+    def test_analyze_catalog(self):
+        report = analyze_palettes()
+        self.assertEqual(set(list_themes()), set(report.keys()))
+        for entry in report.values():
+            self.assertEqual((entry["size"], entry["size"]), entry["delta_e"].shape)
+            self.assertGreaterEqual(entry["min_contrast"], 1.0)
+
+    def test_analyze_palettes(self):
+        theme = Theme(name="test").set_color(palette=["red", "red"], plot_background_color="white")
+        report = analyze_palettes({"mixed": ["black", "white", "#ff0000"]}, themes=[theme])
+        self.assertAlmostEqual(0.0, report["test"]["min_delta_e"])
+        self.assertEqual(3, report["mixed"]["size"])
+        self.assertAlmostEqual(1.0, report["mixed"]["min_contrast"])
+
+    def test_expand_palette(self):
+        palette = ["#ff0000", "#00ff00", "#0000ff"]
+        expanded = expand_palette(palette, 20)
+        self.assertEqual(20, len(expanded))
+        self.assertEqual(palette, expanded[:3])
+        self.assertEqual(20, len(set(expanded)))
+        self.assertEqual(palette[:2], expand_palette(palette, 2))
+
+    def test_theme_colormaps(self):
+        theme = load_theme("scientific").set_color(palette_size=50)
+        cmap = theme.get_colormap()
+        self.assertIs(cmap, theme.get_colormap())
+        self.assertEqual(256, mpl.colormaps["aquarel_scientific"].N)
+        self.assertEqual(50, theme.get_colormap("listed").N)
+        with theme:
+            self.assertEqual(50, len(mpl.rcParams["axes.prop_cycle"]))
+        # The default palette is expanded as well
+        with Theme().set_color(palette_size=20):
+            self.assertEqual(20, len(mpl.rcParams["axes.prop_cycle"]))
+        # Images use the derived colormap if requested
+        with theme.set_color(colormap="listed"):
+            self.assertEqual("aquarel_scientific_listed", mpl.rcParams["image.cmap"])
+            fig, ax = plt.subplots()
+            self.assertEqual("aquarel_scientific_listed", ax.imshow([[0, 1]]).get_cmap().name)
+            plt.close(fig)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+import matplotlib.pyplot as plt
+from aquarel import Theme
+from aquarel.parallel import RenderPool
+
+
+def bar_plot(height):
+    fig, ax = plt.subplots(figsize=(2, 1), dpi=50)
+    ax.bar([0], [height])
+    return fig
+
+
+class TestParallel(unittest.TestCase):
+    def test_render_pool(self):
+        theme = Theme(name="test").set_color(figure_background_color="#00ff00")
+        with RenderPool(processes=2, slots=2, slot_bytes=2 ** 16) as pool:
+            indices = []
+            for result in pool.render(theme, bar_plot, [(height,) for height in range(6)]):
+                with result:
+                    self.assertEqual((50, 100, 4), result.pixels.shape)
+                    self.assertEqual([0, 255, 0, 255], result.pixels[0, 0].tolist())
+                    self.assertLess(result.slot, 2)
+                    indices.append(result.index)
+            self.assertEqual(list(range(6)), sorted(indices))
+            with self.assertRaises(ValueError):
+                list(pool.render(theme, bar_plot, [{"height": 1}], dpi=500))
+
+    def test_early_exit(self):
+        theme = Theme(name="test")
+        with self.assertRaises(RuntimeError):
+            with RenderPool(processes=2, slots=2, slot_bytes=2 ** 16) as pool:
+                for result in pool.render(theme, bar_plot, [(height,) for height in range(8)]):
+                    raise RuntimeError("Consumer failed")
+        # Leaving the loop without releasing results does not block the shutdown either
+        with RenderPool(processes=2, slots=2, slot_bytes=2 ** 16) as pool:
+            for result in pool.render(theme, bar_plot, [(height,) for height in range(8)]):
+                break
+        self.assertIsNone(result.pixels)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import io
+import unittest
+import numpy as np
+import matplotlib.pyplot as plt
+from aquarel import Theme, registry
+from aquarel.profiler import DrawProfiler
+
+
+class TestProfiler(unittest.TestCase):
+    def tearDown(self):
+        plt.close("all")
+
+    def test_profiler(self):
+        draw = plt.Line2D.draw
+        theme = Theme(name="test", headless=True).set_grid(draw=True).set_profiler()
+        with theme:
+            fig, ax = plt.subplots()
+            ax.plot(np.arange(100), label="line")
+            ax.legend()
+            ax.set_title("Title")
+        theme.savefig(fig, io.BytesIO(), format="png")
+        report = theme.profiler.report()
+        self.assertGreater(report["total"], 0)
+        for category in ["grid", "ticks", "tick_labels", "legend", "lines", "title", "axes"]:
+            self.assertIn(category, report["categories"])
+        for artist_type in ["Figure", "Axes", "Line2D", "XTick", "Legend"]:
+            self.assertIn(artist_type, report["types"])
+        times = [value["time"] for value in report["types"].values()]
+        self.assertEqual(sorted(times, reverse=True), times)
+        self.assertAlmostEqual(report["total"], sum(times), places=6)
+        self.assertIn("category", theme.profiler.format_report())
+        # Draw methods are restored once profiling stops
+        self.assertIs(draw, plt.Line2D.draw)
+
+    def test_stopped_on_error(self):
+        def fail(axes=None):
+            raise RuntimeError("Transform failed")
+
+        draw = plt.Line2D.draw
+        registry.register_transform("fail", fail)
+        try:
+            theme = Theme(name="test", headless=True).set_profiler().set_transforms(fail={})
+            with self.assertRaises(RuntimeError):
+                with theme:
+                    plt.subplots()
+        finally:
+            registry._registry.pop("fail")
+        self.assertIs(draw, plt.Line2D.draw)
+        with DrawProfiler():
+            pass
+
+    def test_single_active(self):
+        with DrawProfiler():
+            with self.assertRaises(RuntimeError):
+                DrawProfiler().start()
+
+
+if __name__ == "__main__":
+    unittest.main()
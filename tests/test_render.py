@@ -0,0 +1,80 @@
+import unittest
+import numpy as np
+import matplotlib.pyplot as plt
+from aquarel import Theme
+import gc
+import os
+import tempfile
+import weakref
+from PIL import Image
+from aquarel.render import draw_resolutions, draw_to_array, render_to_array, save_resolutions
+
+
+def line_plot(values):
+    fig, ax = plt.subplots(figsize=(4, 3), dpi=50)
+    ax.plot(values)
+    return fig, ax
+
+
+class TestRender(unittest.TestCase):
+    def setUp(self):
+        self.theme = Theme(name="test", headless=True).set_color(figure_background_color="#ff0000")
+
+    def test_render_to_array(self):
+        pixels = render_to_array(self.theme, line_plot, np.arange(10))
+        self.assertEqual((150, 200, 4), pixels.shape)
+        self.assertEqual(np.uint8, pixels.dtype)
+        self.assertEqual([255, 0, 0, 255], pixels[0, 0].tolist())
+        copy = render_to_array(self.theme, line_plot, np.arange(10), dpi=100, copy=True)
+        self.assertEqual((300, 400, 4), copy.shape)
+        self.assertIsNone(copy.base)
+
+    def test_render_transparent(self):
+        pixels = render_to_array(self.theme.set_export(transparent=True), line_plot, np.arange(10))
+        self.assertEqual(0, pixels[0, 0, 3])
+
+    def test_draw_to_array_restores(self):
+        fig, ax = line_plot(np.arange(10))
+        canvas = fig.canvas
+        self.assertEqual((300, 400, 4), draw_to_array(self.theme, fig, dpi=100).shape)
+        self.assertIs(canvas, fig.canvas)
+        self.assertIsNotNone(fig.canvas.manager)
+        self.assertEqual(50, fig.dpi)
+        # Pooled canvases do not keep closed figures alive
+        ref = weakref.ref(fig)
+        plt.close(fig)
+        del fig, ax, canvas
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_draw_resolutions(self):
+        with self.theme:
+            fig, ax = line_plot(np.arange(10))
+        arrays = draw_resolutions(self.theme, fig, [100, 25, 50], legible_text=5)
+        self.assertEqual((300, 400, 4), arrays[100].shape)
+        self.assertEqual((150, 200, 4), arrays[50].shape)
+        self.assertEqual((75, 100, 4), arrays[25].shape)
+        self.assertEqual([255, 0, 0, 255], arrays[25][0, 0].tolist())
+        self.assertEqual(50, fig.dpi)
+        with tempfile.TemporaryDirectory() as directory:
+            targets = {os.path.join(directory, name): dpi for name, dpi in [("thumb.png", 20), ("web.jpg", 50)]}
+            save_resolutions(self.theme, fig, targets)
+            self.assertEqual((80, 60), plt.imread(os.path.join(directory, "thumb.png")).shape[1::-1])
+            # Export settings apply to the saved files
+            self.theme.set_export(png_compression=0, strip_metadata=True)
+            save_resolutions(self.theme, fig, {os.path.join(directory, "raw.png"): 20})
+            self.assertGreater(os.path.getsize(os.path.join(directory, "raw.png")),
+                               os.path.getsize(os.path.join(directory, "thumb.png")))
+            with Image.open(os.path.join(directory, "raw.png")) as image:
+                self.assertNotIn("Software", image.info)
+            with Image.open(os.path.join(directory, "thumb.png")) as image:
+                self.assertIn("Software", image.info)
+        # Downsampled sizes match native draws
+        fig.set_size_inches(4.03, 3.01)
+        arrays = draw_resolutions(self.theme, fig, [100, 33])
+        self.assertEqual(draw_to_array(self.theme, fig, dpi=33).shape, arrays[33].shape)
+        plt.close(fig)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
 import sys
 sys.path.append('../aquarel')
 
+import io
 import unittest
+import matplotlib as mpl
 import matplotlib.pyplot as plt
 from aquarel import Theme
 from cycler import cycler
@@ -226,6 +228,124 @@ class TestTheme(unittest.TestCase):
         legend_test("margin", [0, 0.5, 1.5, 5])
         legend_test("spacing", [0, 0.5, 1.5, 5])
 
+    def test_set_export(self):
+        def export_test(parameter, options):
+            print(f"\n***** export.{parameter} *****")
+            for option in options:
+                print(f"> set export.{parameter} to be {option}")
+                with self.theme.set_export(**{parameter: option}):
+                    for param in self.theme._rcparams_mapping["export"][parameter]:
+                        print(f'>> check if plt.rcParams["{param}"] == {option}')
+                        self.assertEqual(option, plt.rcParams[param])
+
+        export_test("dpi", [75, 150, 300])
+        export_test("format", self.theme._export_format_options)
+        export_test("bbox", ["tight"])
+        export_test("pad", [0, 0.1, 0.5])
+        export_test("transparent", [True, False])
+        export_test("pdf_fonttype", self.theme._pdf_fonttype_options)
+        export_test("pdf_compression", [0, 6, 9])
+        export_test("svg_fonttype", self.theme._svg_fonttype_options)
+
+    def test_set_layout(self):
+        print(f"\n***** layout.engine *****")
+        for engine in self.theme._layout_engine_options:
+            print(f"> set layout.engine to be {engine}")
+            with self.theme.set_layout(engine=engine, pad=0.1, space=0.05):
+                fig, ax = plt.subplots()
+                self.assertEqual(engine == "tight", plt.rcParams["figure.autolayout"])
+                self.assertEqual(0.1, plt.rcParams["figure.constrained_layout.h_pad"])
+            layout = fig.get_layout_engine()
+            expected = {"constrained": "ConstrainedLayoutEngine", "compressed": "ConstrainedLayoutEngine",
+                        "tight": "TightLayoutEngine"}[engine]
+            self.assertEqual(expected, type(layout).__name__)
+            self.assertEqual(engine == "compressed", getattr(layout, "_compress", False))
+            # The tight bounding box is skipped, so the figure keeps its size
+            buffer = io.BytesIO()
+            self.theme.set_export(format="png", dpi=50, bbox="tight").savefig(fig, buffer)
+            self.assertEqual((320, 240), plt.imread(io.BytesIO(buffer.getvalue())).shape[1::-1])
+            # An explicit tight bounding box takes precedence
+            buffer = io.BytesIO()
+            self.theme.savefig(fig, buffer, bbox_inches="tight", pad_inches=1)
+            self.assertNotEqual((320, 240), plt.imread(io.BytesIO(buffer.getvalue())).shape[1::-1])
+            plt.close(fig)
+
+    def test_set_image(self):
+        print(f"\n***** image presets *****")
+        for preset, options in self.theme._image_presets.items():
+            print(f"> set image preset to be {preset}")
+            with self.theme.set_image(preset=preset):
+                self.assertEqual(options["interpolation"], plt.rcParams["image.interpolation"])
+                self.assertEqual(options["resample"], plt.rcParams["image.resample"])
+                self.assertEqual(options["composite"], plt.rcParams["image.composite_image"])
+                self.assertEqual(options["interpolation_stage"], plt.rcParams["image.interpolation_stage"])
+        # Explicit arguments take precedence over the preset
+        self.theme.set_image(preset="preview", interpolation="bilinear")
+        self.assertEqual("bilinear", self.theme.params["image"]["interpolation"])
+        self.assertFalse(self.theme.params["image"]["resample"])
+        with self.assertRaises(ValueError):
+            self.theme.set_image(preset="unknown")
+        # Parameters mapping to rcparams unknown to the installed matplotlib version are skipped
+        mapping = self.theme._rcparams_mapping["image"]["interpolation_stage"]
+        self.theme._rcparams_mapping["image"]["interpolation_stage"] = ["image.unknown"]
+        try:
+            with self.theme:
+                self.assertNotIn("image.unknown", plt.rcParams)
+        finally:
+            self.theme._rcparams_mapping["image"]["interpolation_stage"] = mapping
+
+    def test_restyle(self):
+        light = Theme(name="light").set_color(palette=["#ff0000", "#00ff00"], figure_background_color="#ffffff")
+        dark = Theme(name="dark").set_color(palette=["#0000ff", "#ffff00"], figure_background_color="#000000",
+                                            text_color="#eeeeee").set_grid(draw=True)
+        with light:
+            fig, ax = plt.subplots()
+            first, = ax.plot([0, 1])
+            second, = ax.plot([1, 0])
+            bars = ax.bar([0, 1], [1, 2], color="#123456")
+            ax.set_title("Title")
+        dark.restyle(fig)
+        self.assertEqual(mpl.colors.to_rgba("#000000"), fig.patch.get_facecolor())
+        self.assertEqual(mpl.colors.to_rgba("#0000ff"), mpl.colors.to_rgba(first.get_color()))
+        self.assertEqual(mpl.colors.to_rgba("#ffff00"), mpl.colors.to_rgba(second.get_color()))
+        self.assertEqual(mpl.colors.to_rgba("#123456"), bars.patches[0].get_facecolor())
+        self.assertEqual(mpl.colors.to_rgba("#eeeeee"), mpl.colors.to_rgba(ax.title.get_color()))
+        self.assertTrue(ax.xaxis.get_gridlines()[0].get_visible())
+        plt.close(fig)
+
+    def test_export_kwargs(self):
+        print(f"\n***** export presets *****")
+        for preset, options in self.theme._export_presets.items():
+            print(f"> set export preset to be {preset}")
+            kwargs = self.theme.set_export(preset=preset).export_kwargs()
+            self.assertEqual(options["format"], kwargs["format"])
+            if options.get("strip_metadata", False):
+                self.assertTrue(all(value is None for value in kwargs["metadata"].values()))
+        kwargs = self.theme.set_export(preset="fast_png", png_compression=3).export_kwargs()
+        self.assertEqual({"compress_level": 3}, kwargs["pil_kwargs"])
+
+    def test_headless(self):
+        print(f"\n***** headless *****")
+        theme = Theme(name="test", headless=True)
+        with theme:
+            print(f'>> check if the backend is agg')
+            self.assertEqual("agg", plt.get_backend().lower())
+            fig, ax = plt.subplots()
+        theme.savefig(fig, io.BytesIO(), format="png")
+        print(f'>> check if the figure was closed after export')
+        self.assertFalse(plt.fignum_exists(fig.number))
+        print(f'>> check if open figures of another backend are kept')
+        plt.switch_backend("svg")
+        try:
+            fig = plt.figure()
+            with self.assertWarns(UserWarning):
+                theme.apply()
+            self.assertTrue(plt.fignum_exists(fig.number))
+            self.assertEqual("svg", plt.get_backend().lower())
+        finally:
+            plt.close("all")
+            plt.switch_backend("agg")
+
     def test_set_tick_label(self):
         def tick_label_test(parameter, option):
             print(f"\n***** set_tick_labels.{parameter} *****")
@@ -0,0 +1,216 @@
+import json
+import unittest
+from importlib.metadata import EntryPoint
+import numpy as np
+import matplotlib.pyplot as plt
+from aquarel import Theme
+from aquarel import registry
+from aquarel.transforms import offset, rotate_xlabel, trim
+
+
+class TestTransforms(unittest.TestCase):
+    def setUp(self):
+        self.theme = Theme(name="test", description="A test theme.", headless=True)
+
+    def tearDown(self):
+        plt.close("all")
+
+    def test_all_figures(self):
+        with self.theme.set_transforms(offset=7):
+            first, ax = plt.subplots()
+            second = plt.figure()
+            subfigures = second.subfigures(1, 2)
+            subfigures[0].subplots(2)
+            subfigures[1].subplots(1)
+        for ax_i in [*first.axes, *second.axes]:
+            self.assertEqual(("outward", 7), ax_i.spines["left"].get_position())
+        self.assertEqual(4, len(first.axes) + len(second.axes))
+
+    def test_incremental(self):
+        with self.theme.set_transforms(offset=7):
+            fig, (changed, unchanged) = plt.subplots(1, 2)
+        for ax_i in [changed, unchanged]:
+            ax_i.spines["left"].set_position(("outward", 0))
+        changed.set_xlim(0, 5)
+        self.theme.apply_transforms([fig])
+        self.assertEqual(("outward", 7), changed.spines["left"].get_position())
+        self.assertEqual(("outward", 0), unchanged.spines["left"].get_position())
+        # Setting ticks replaces the locator, which marks the axes as changed
+        unchanged.set_xticks([0, 0.5])
+        self.theme.apply_transforms([fig])
+        self.assertEqual(("outward", 7), unchanged.spines["left"].get_position())
+
+    def test_decimate(self):
+        x = np.arange(200_000)
+        y = np.sin(x / 1000) + np.random.default_rng(0).normal(size=x.size)
+        y[1000] = np.nan
+        for method in self.theme._decimate_options:
+            with self.theme.set_transforms(decimate=method):
+                fig, ax = plt.subplots(figsize=(4, 3), dpi=100)
+                line, = ax.plot(x, y)
+                markers, = ax.plot(x, y, marker="o")
+            self.assertLess(len(line.get_xdata()), 4 * 400)
+            self.assertTrue(np.isnan(line.get_ydata()).any())
+            self.assertEqual(x.size, len(markers.get_xdata()))
+            if method == "minmax":
+                self.assertEqual(np.nanmax(y), np.nanmax(line.get_ydata()))
+                self.assertEqual(np.nanmin(y), np.nanmin(line.get_ydata()))
+        # Lines are decimated to the pixel columns of the export resolution
+        with self.theme.set_transforms(decimate="minmax").set_export(dpi=300):
+            fig, ax = plt.subplots(figsize=(4, 3), dpi=50)
+            line, = ax.plot(x, y)
+        columns = ax.get_window_extent().width * 300 / 50
+        self.assertGreater(len(line.get_xdata()), 2 * columns)
+        self.assertLess(len(line.get_xdata()), 4 * columns + 8)
+
+    def test_rasterize(self):
+        rng = np.random.default_rng(0)
+        with self.theme.set_transforms(rasterize=1000, rasterize_zorder=0.5):
+            fig, ax = plt.subplots()
+            dense = ax.scatter(*rng.normal(size=(2, 5000)))
+            sparse = ax.scatter(*rng.normal(size=(2, 50)))
+            line, = ax.plot(rng.normal(size=5000))
+        self.assertTrue(dense.get_rasterized())
+        self.assertTrue(line.get_rasterized())
+        self.assertFalse(sparse.get_rasterized())
+        self.assertFalse(any(spine.get_rasterized() for spine in ax.spines.values()))
+        self.assertEqual(0.5, ax.get_rasterization_zorder())
+
+    def test_place_legend(self):
+        x = np.linspace(0, 10, 1000)
+        with self.theme.set_transforms(place_legend=16):
+            fig, ax = plt.subplots()
+            ax.plot(x, np.exp(-x), label="decay")
+            legend = ax.legend()
+            fixed = fig.add_subplot(2, 2, 4)
+            fixed.plot(x, label="fixed")
+            fixed.legend(loc="lower left")
+        self.assertEqual(1, legend._get_loc())
+        self.assertEqual(3, fixed.get_legend()._get_loc())
+        # Legends placed before are updated when the data changes
+        ax.plot(x, 1 - np.exp(-x) * 0.1, label="plateau")
+        self.theme.apply_transforms()
+        self.assertNotEqual(1, legend._get_loc())
+
+    def test_limit_ticks(self):
+        dates = np.arange("2000-01-01", "2020-01-01", dtype="datetime64[D]")
+        with self.theme.set_ticks(draw_minor=True).set_transforms(limit_ticks=5, limit_minor_ticks=20, trim="both"):
+            fig, (wide, log, date) = plt.subplots(1, 3)
+            wide.plot([0, 1e6], [0, 1])
+            log.loglog([1, 1e30], [1, 1e30])
+            date.plot(dates, np.arange(dates.size))
+        for ax_i in [wide, log, date]:
+            for axis in [ax_i.xaxis, ax_i.yaxis]:
+                low, high = sorted(axis.get_view_interval())
+                for locs, budget in [(axis.get_majorticklocs(), 5), (axis.get_minorticklocs(), 20)]:
+                    self.assertLessEqual(np.count_nonzero((locs >= low) & (locs <= high)), budget)
+        # Logarithmic minor ticks are thinned rather than removed
+        with self.theme.set_ticks(draw_minor=True).set_transforms(limit_ticks=5, limit_minor_ticks=10):
+            fig, ax = plt.subplots()
+            ax.semilogy([1, 1e3])
+        low, high = sorted(ax.yaxis.get_view_interval())
+        locs = ax.yaxis.get_minorticklocs()
+        self.assertTrue(0 < np.count_nonzero((locs >= low) & (locs <= high)) <= 10)
+
+    def test_thin_labels(self):
+        self.assertNotIn("thin_labels", self.theme.set_transforms(thin_labels="diagonal").transforms)
+        categories = [f"category {i}" for i in range(300)]
+        with self.theme.set_transforms(thin_labels="both"):
+            fig, ax = plt.subplots(figsize=(6, 4))
+            ax.bar(categories, np.arange(300))
+        fig.canvas.draw()
+        labels = [label for label in ax.get_xticklabels() if label.get_text()]
+        self.assertLess(len(labels), 20)
+        self.assertEqual("category 0", labels[0].get_text())
+        extents = [label.get_window_extent() for label in labels]
+        self.assertTrue(all(left.x1 < right.x0 for left, right in zip(extents, extents[1:])))
+        self.assertTrue(all(label.get_text() for label in ax.get_yticklabels()))
+        # More labels are shown once they fit
+        fig.set_size_inches(60, 4)
+        self.theme.apply_transforms([fig])
+        fig.canvas.draw()
+        self.assertGreater(len([label for label in ax.get_xticklabels() if label.get_text()]), 5 * len(labels))
+
+    def test_density(self):
+        rng = np.random.default_rng(0)
+        for method in self.theme._density_options:
+            with self.theme.set_transforms(density=1000, density_method=method):
+                fig, ax = plt.subplots()
+                dense = ax.scatter(*rng.normal(size=(2, 5000)), label="dense")
+                sparse = ax.scatter(*rng.normal(size=(2, 50)), label="sparse")
+                limits = ax.get_xlim(), ax.get_ylim()
+            self.assertEqual(0, len(dense.get_offsets()))
+            self.assertEqual(50, len(sparse.get_offsets()))
+            self.assertEqual(limits, (ax.get_xlim(), ax.get_ylim()))
+            self.assertEqual(1, len(ax.images) if method == "histogram" else len(ax.collections) - 2)
+            self.assertEqual(["dense", "sparse"], ax.get_legend_handles_labels()[1])
+        # Hollow scatters are colored by their edge color, individually colored points are kept
+        with self.theme.set_transforms(density=1000):
+            fig, ax = plt.subplots()
+            hollow = ax.scatter(*rng.normal(size=(2, 5000)), facecolors="none", edgecolors="#ff0000")
+            colors = rng.uniform(size=(5000, 4))
+            colored = ax.scatter(*rng.normal(size=(2, 5000)), c=colors)
+        self.assertEqual(0, len(hollow.get_offsets()))
+        self.assertEqual((1.0, 0.0, 0.0), tuple(ax.images[0].get_cmap()(1.0)[:3]))
+        self.assertEqual(5000, len(colored.get_offsets()))
+
+    def test_fused(self):
+        with self.theme.set_ticks(draw_minor=True).set_transforms(trim="both", offset=5, rotate_xlabel=45):
+            fused, fused_ax = plt.subplots()
+            fused_ax.plot([0, 1, 2], [1, 3, 2])
+        with self.theme.set_transforms():
+            separate, separate_ax = plt.subplots()
+            separate_ax.plot([0, 1, 2], [1, 3, 2])
+        for transform, args in [(trim, "both"), (offset, 5), (rotate_xlabel, 45)]:
+            transform(args, axes=[separate_ax])
+        for side in ["top", "right", "left", "bottom"]:
+            self.assertEqual(separate_ax.spines[side].get_position(), fused_ax.spines[side].get_position())
+            self.assertEqual(separate_ax.spines[side].get_bounds(), fused_ax.spines[side].get_bounds())
+        self.assertEqual(list(separate_ax.get_xticks(minor=True)), list(fused_ax.get_xticks(minor=True)))
+        self.assertEqual(45, fused_ax.get_xticklabels()[0].get_rotation())
+        # Per-axes transforms share one pass
+        passes = []
+        for name, touches in [("first", ["ticks"]), ("second", ["spines"])]:
+            registry.register_transform(
+                name, lambda axes=None: None, touches=touches, per_axes=lambda axes_pass: passes.append(axes_pass)
+            )
+        try:
+            registry.run_transforms({"second": {}, "first": {}}, [fused_ax])
+        finally:
+            registry._registry.pop("first")
+            registry._registry.pop("second")
+        self.assertEqual(2, len(passes))
+        self.assertIs(passes[0], passes[1])
+
+    def test_registry(self):
+        calls = []
+
+        @registry.register_transform(touches=["artists"])
+        def record(label, axes=None):
+            calls.append((label, len(axes)))
+
+        self.assertEqual(["record", "trim"], registry.transform_order(["trim", "record"]))
+        with self.theme.set_transforms(trim="both", record={"label": "test"}):
+            plt.subplots(1, 2)
+        self.assertEqual([("test", 2)], calls)
+        with self.assertWarns(UserWarning):
+            self.theme.set_transforms(missing={})
+        self.assertEqual({}, self.theme.transforms)
+        # Third-party transforms are discovered by name and only loaded when used
+        entry_points = registry._discover_entry_points()
+        registry._entry_points = {
+            **entry_points,
+            "plugin": EntryPoint(name="plugin", value="json:dumps", group=registry.ENTRY_POINT_GROUP),
+        }
+        try:
+            self.assertIn("plugin", self.theme.set_transforms(plugin={}).transforms)
+            self.assertNotIn("plugin", registry._registry)
+            self.assertIs(json.dumps, registry.get_transform("plugin"))
+        finally:
+            registry._entry_points = entry_points
+            registry._registry.pop("plugin", None)
+            registry._registry.pop("record", None)
+
+
+if __name__ == "__main__":
+    unittest.main()